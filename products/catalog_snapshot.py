@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+catalog_snapshot.py – parse a Shopify export once, then load vendors/columns from a Parquet snapshot.
+
+Every product script starts from a multi-MB export CSV. snapshot() stores it,
+typed with the shopify_export.py SCHEMA, as zstd-compressed Parquet in
+.catalog/<export name>/ next to the export:
+
+    data/product_vendor=<Vendor>/…parquet   one partition per vendor
+    index.parquet                           Variant SKU, Handle, vendor, row
+    meta.json                               source size/mtime/sha256, header
+
+Vendor is only filled on a product's first row in a Shopify export, so the
+partition key (product_vendor) is the Vendor of the row's Handle. load_snapshot()
+reads only the requested vendors' files and columns, memory-mapped, and returns
+rows in export order with the export's row numbers as the index:
+
+    df = load_snapshot("products_export.csv", vendors=["D'Addario"], columns=["Variant SKU", "Variant Price"])
+    df = load_snapshot("products_export.csv", skus=["EJ16", "EXL110"])   # index → only those vendors' files
+
+The snapshot is rebuilt on load when the export's contents change (size/mtime,
+then sha256, as in supplier_lists.py). ShopifyExport(path, snapshot=True), or
+CATALOG_SNAPSHOT=1 in the environment, loads its frame through here.
+
+    python catalog_snapshot.py products_export.csv [--refresh]
+    python catalog_snapshot.py products_export.csv --vendor Boss --column Title --column "Variant Price"
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from shopify_export import SCHEMA, TEXT
+from supplier_lists import _file_hash
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:     # snapshots need pyarrow; the CSV path in shopify_export.py does not
+    pa = ds = pq = None
+
+SNAPSHOT_DIR = ".catalog"
+SNAPSHOT_VERSION = "1"      # bump when the stored layout or SCHEMA changes so old snapshots are rebuilt
+PARTITION = "product_vendor"
+ROW = "row"
+INDEX_COLS = ["Variant SKU", "Handle"]
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError("catalog_snapshot.py needs pyarrow (pip install pyarrow)")
+
+
+def snapshot_dir(path) -> Path:
+    path = Path(path)
+    return path.parent / SNAPSHOT_DIR / path.name
+
+
+def product_vendor(df: pd.DataFrame) -> pd.Series:
+    """Each row's product Vendor (the first non-blank Vendor of its Handle)."""
+    vendor = df["Vendor"].astype("string") if "Vendor" in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+    if "Handle" in df.columns:
+        vendor = vendor.groupby(df["Handle"], sort=False).transform("first").fillna(vendor)
+    return vendor
+
+
+def snapshot(path, refresh: bool = False) -> Path:
+    """Write (or reuse) the snapshot of the export at `path`; returns its directory."""
+    from shopify_export import ShopifyExport
+
+    _require_pyarrow()
+    path = Path(path)
+    root = snapshot_dir(path)
+    meta_path = root / "meta.json"
+    st = path.stat()
+    stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    meta = {}
+    if meta_path.exists() and not refresh:
+        meta = json.loads(meta_path.read_text())
+        if meta.get("version") != SNAPSHOT_VERSION:
+            meta = {}
+        elif {k: meta.get(k) for k in stamp} == stamp:
+            return root
+
+    # size/mtime moved (or no snapshot yet): only re-ingest if the bytes changed
+    digest = _file_hash(path)
+    if meta.get("sha256") != digest:
+        export = ShopifyExport(path, snapshot=False)
+        df = export.df
+        df[PARTITION] = product_vendor(df)
+        df[ROW] = np.arange(len(df), dtype=np.int64)
+
+        shutil.rmtree(root / "data", ignore_errors=True)
+        root.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_to_dataset(table, root / "data", partition_cols=[PARTITION], compression="zstd")
+        index = df[[c for c in INDEX_COLS if c in df.columns] + [PARTITION, ROW]]
+        index.to_parquet(root / "index.parquet", index=False, compression="zstd")
+        meta = {"header": export.header, "rows": len(df)}
+    root.mkdir(parents=True, exist_ok=True)
+    meta_path.write_text(json.dumps({**meta, "version": SNAPSHOT_VERSION, "source": path.name,
+                                     "sha256": digest, **stamp}, indent=2))
+    return root
+
+
+def load_index(path) -> pd.DataFrame:
+    """Variant SKU / Handle / product_vendor / row of every export row."""
+    _require_pyarrow()
+    return pd.read_parquet(snapshot(path) / "index.parquet", memory_map=True)
+
+
+def load_snapshot(path, vendors=None, columns=None, skus=None, handles=None) -> pd.DataFrame:
+    """Rows of the export at `path` (snapshotting it first if needed), optionally narrowed.
+
+    vendors   product Vendor values (matched per Handle, exact)
+    columns   columns to load, in any order (default: all)
+    skus / handles   only these Variant SKUs / Handles; the index limits the read
+              to the vendor partitions that contain them
+    """
+    root = snapshot(path)
+    meta = json.loads((root / "meta.json").read_text())
+    header = meta["header"]
+    if not meta["rows"]:        # a header-only export writes no data files
+        return _empty(header, columns)
+    filters = []
+    if vendors is not None:
+        filters.append((PARTITION, "in", list(vendors)))
+    if skus is not None or handles is not None:
+        index = pd.read_parquet(root / "index.parquet", memory_map=True)
+        hit = pd.Series(True, index=index.index)
+        if skus is not None:
+            hit &= index["Variant SKU"].isin(list(skus))
+        if handles is not None:
+            hit &= index["Handle"].isin(list(handles))
+        if vendors is not None:
+            hit &= index[PARTITION].isin(list(vendors))
+        if not hit.any():
+            return _empty(header, columns)
+        filters.append((ROW, "in", index.loc[hit, ROW].tolist()))
+        parts = index.loc[hit, PARTITION].dropna().unique().tolist()
+        if index.loc[hit, PARTITION].notna().all():
+            filters.append((PARTITION, "in", parts))
+
+    wanted = header if columns is None else [c for c in header if c in set(columns)]
+    table = pq.read_table(root / "data", columns=wanted + [ROW], filters=filters or None,
+                          memory_map=True, partitioning=_partitioning())
+    return _frame(table, wanted)
+
+
+def _partitioning():
+    # explicit type: an export without any Vendor has only the null partition, which can't be inferred
+    return ds.partitioning(pa.schema([(PARTITION, pa.string())]), flavor="hive")
+
+
+def _frame(table, wanted) -> pd.DataFrame:
+    df = table.to_pandas().sort_values(ROW).set_index(ROW)
+    df.index.name = None
+    # Parquet keeps strings but not their pandas storage; restore the shopify_export dtypes
+    return df[wanted].astype({c: SCHEMA.get(c, TEXT) for c in wanted})
+
+
+def _empty(header, columns) -> pd.DataFrame:
+    wanted = header if columns is None else [c for c in header if c in set(columns)]
+    return pd.DataFrame({c: pd.Series(dtype=SCHEMA.get(c, TEXT)) for c in wanted},
+                        index=pd.Index([], dtype=np.int64))
+
+
+# ----------------------------------------------------------------------
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Snapshot a Shopify export to Parquet (by vendor) and query it.")
+    ap.add_argument("export", help="Shopify product export CSV")
+    ap.add_argument("--refresh", action="store_true", help="Rebuild the snapshot even if it is current")
+    ap.add_argument("--vendor", action="append", help="Only this vendor (repeatable)")
+    ap.add_argument("--column", action="append", help="Only this column (repeatable)")
+    ap.add_argument("--sku", action="append", help="Only this Variant SKU (repeatable)")
+    args = ap.parse_args()
+
+    root = snapshot(args.export, refresh=args.refresh)
+    meta = json.loads((root / "meta.json").read_text())
+    vendors = load_index(args.export)[PARTITION].value_counts()
+    print(f"{args.export}: {meta['rows']} row(s), {len(vendors)} vendor(s) → {root}")
+    if args.vendor or args.column or args.sku:
+        df = load_snapshot(args.export, vendors=args.vendor, columns=args.column, skus=args.sku)
+        print(df.to_string() if not df.empty else "No matching rows.")
+
+
+if __name__ == "__main__":
+    main()
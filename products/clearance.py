@@ -1,63 +1,114 @@
 # clearance.py
 
-# Script to combine multiple CSV files into a pandas dataframe and replace the text 'Used' or 
+# Script to combine multiple CSV files into a pandas dataframe and replace the text 'Used' or
 # 'Previously Rented' with 'Gently Used' in the 'Title' and 'Body (HTML)' columns.
 
-import pandas as pd
+import argparse
 import glob
 import re
+from functools import lru_cache
+
+import pandas as pd
+
+from shopify_export import ShopifyExport, write_combined
+
+# One pass over the text: 'previously rented' is always replaced; 'used' is replaced unless
+# 'gently' + up to 14 whitespace characters sits right before it. That is the same rule as the
+# old two-pass version, whose check looked for 'gently\s*$' in the 20 characters before 'used'
+# (6 letters + 14 spaces = 20).
+USED_PATTERN = re.compile(r'(?i)(previously rented)|(gently\s{0,14})?used')
+
+# HTML-aware variant of the same scan: tags, comments and <script>/<style> blocks are matched
+# first and passed through untouched, so only text nodes are rewritten – 'used' in an href,
+# alt text or class name is left alone – and each body is still scanned once, left to right.
+# 'gently' still protects 'used' across inline tags and &nbsp; ('Gently <b>used</b>').
+HTML_PATTERN = re.compile(
+    r'(?is)(?P<markup><!--.*?-->|<(?P<raw>script|style)\b.*?</(?P=raw)\s*>|</?[a-z!?][^>]*>)'
+    r'|(previously rented)|(?P<gently>gently(?:\s|&nbsp;|</?[a-z][^>]*>){0,14})?used'
+)
 
-# 1. Load all matching CSV files. 
-files = glob.glob('clearance?.csv')
+# Replacement text per column: Title gets all uppercase
+REPLACEMENTS = {'Title': "GENTLY USED", 'Body (HTML)': "Gently used"}
+
+
+def make_replacer(replacement="Gently Used"):
+    """The re.sub callback for `replacement`: leave 'gently … used' alone, swap everything else."""
+    # The single pass never re-scans inserted text, so the replacement must not itself contain an
+    # un-prefixed 'used' or end in 'gently' (the old version would have rewritten those again).
+    if any(not m.group(2) for m in USED_PATTERN.finditer(replacement)) or re.search(r'(?i)gently\s*$', replacement):
+        raise ValueError(f"replacement {replacement!r} would be rewritten by its own rule")
+
+    def replace(m):
+        return m.group(0) if m.group(2) else replacement
+    return replace
 
-# 2. Read each file into a DataFrame and then concatenate.
-df_list = [pd.read_csv(f) for f in files]
-df = pd.concat(df_list, ignore_index=True)
 
 def fix_text(text, replacement="Gently Used"):
     """
     1) Replace 'previously rented' -> `replacement` (case-insensitive).
-    2) Replace 'used' -> `replacement` (case-insensitive), 
-       but skip if it's already preceded by 'gently' (any case + any amount of spaces).
+    2) Replace 'used' -> `replacement` (case-insensitive),
+       but skip if it's already preceded by 'gently' (any case + up to 14 spaces).
     """
     if pd.isnull(text):
         return text  # if field is NaN
+    return USED_PATTERN.sub(make_replacer(replacement), text)
+
+
+@lru_cache(maxsize=4096)
+def fix_html(html, replacement="Gently Used"):
+    """fix_text for text nodes only; cached, since many listings share the same boilerplate body."""
+    make_replacer(replacement)      # same check on the replacement text
+
+    def replace(m):
+        if m.group('markup') or m.group('gently'):
+            return m.group(0)
+        return replacement
+    return HTML_PATTERN.sub(replace, html)
+
+
+def fix_column(values: pd.Series, replacement="Gently Used", html_aware=False) -> pd.Series:
+    """fix_text (or fix_html) over a whole column with one compiled regex; empty cells stay empty."""
+    # object dtype: pyarrow strings have no callable-replacement fast path and would warn on fallback
+    values_obj = values.astype(object)
+    if html_aware:
+        fixed = values_obj.map(lambda v: v if pd.isnull(v) else fix_html(v, replacement))
+    else:
+        fixed = values_obj.str.replace(USED_PATTERN, make_replacer(replacement), regex=True)
+    return fixed.astype(values.dtype)
+
+
+def fix_export(df: pd.DataFrame, html_aware=False) -> pd.DataFrame:
+    """Apply fix_column with each column's replacement text (Title uppercase, Body sentence case).
+
+    With html_aware, Body (HTML) is rewritten in its text nodes only.
+    """
+    for col, replacement in REPLACEMENTS.items():
+        if col in df.columns:
+            df[col] = fix_column(df[col], replacement, html_aware=html_aware and col == 'Body (HTML)')
+    return df
+
+
+def main(pattern='clearance?.csv', output='clearance_combined.csv', html_aware=False):
+    # 1. Load all matching CSV files.
+    files = sorted(glob.glob(pattern))
+
+    # 2. Read just the Title / Body (HTML) columns of each file; the other columns
+    #    are copied straight from the source files when the result is written.
+    exports = [ShopifyExport(f, columns=list(REPLACEMENTS)) for f in files]
+
+    # 3. Rewrite 'Used' / 'Previously Rented' in both columns
+    for export in exports:
+        fix_export(export.df, html_aware=html_aware)
+
+    # 4. Save the combined result to a new CSV
+    write_combined(exports, [e.df for e in exports], output)
+
 
-    # -- Step A: Replace 'previously rented' with chosen replacement
-    text = re.sub(r'(?i)previously rented', replacement, text)
-
-    # -- Step B: Replace 'used' except if preceded by 'gently' (any case/spaces)
-    # We'll do this with a function to avoid variable-length lookbehind.
-    pattern = re.compile(r'(?i)used')  # case-insensitive match for "used"
-    
-    def replace_used(m):
-        start = m.start()
-        # Grab some context before 'used'
-        before_text = text[max(0, start-20):start]  # 20 chars is arbitrary padding
-        # Check if it ends with "gently" (in any case) possibly followed by spaces
-        # We'll do a small regex on `before_text` itself:
-        if re.search(r'(?i)gently\s*$', before_text):
-            # If the preceding text ends with "gently" + spaces, do NOT replace
-            return m.group(0)  # just return "used" as-is
-        else:
-            return replacement
-    
-    # Perform the second replacement using our custom function
-    text = re.sub(pattern, replace_used, text)
-
-    return text
-
-# 3. Apply fix_text with different replacements depending on the column
-for col in ['Title', 'Body (HTML)']:
-    if col in df.columns:
-        if col == 'Title':
-            # In Title, use all uppercase "GENTLY USED"
-            df[col] = df[col].astype(str).apply(lambda x: fix_text(x, replacement="GENTLY USED"))
-        else:
-            # In Body, use "Gently Used"
-            df[col] = df[col].astype(str).apply(lambda x: fix_text(x, replacement="Gently used"))
-
-
-
-# 4. (Optional) Save the result to a new CSV, if desired
-df.to_csv('clearance_combined.csv', index=False)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Combine clearance?.csv files and rewrite 'Used' as 'Gently Used'.")
+    parser.add_argument("--pattern", default='clearance?.csv', help="Glob of input CSVs")
+    parser.add_argument("-o", "--output", default='clearance_combined.csv')
+    parser.add_argument("--html-aware", action="store_true",
+                        help="Rewrite only the text of Body (HTML), never tags, attributes, URLs or scripts")
+    args = parser.parse_args()
+    main(args.pattern, args.output, args.html_aware)
@@ -1,10 +1,11 @@
 # combine_csv_files.py
 
 import argparse
-import pandas as pd
-import glob
 
-def combine_csv_files(file_name_pattern: str, output_filename: str = "output_file.csv", **kwargs):
+from csv_combine import add_dedupe_args, combine_csv, dedupe_keys, find_files, print_collisions, print_report
+
+def combine_csv_files(file_name_pattern: str, output_filename: str = "output_file.csv", dedupe=None,
+                      keep: str = "first", collisions_file=None, **kwargs):
     """
     Combine all CSV files matching a given filename pattern into a single CSV file.
 
@@ -14,21 +15,27 @@ def combine_csv_files(file_name_pattern: str, output_filename: str = "output_fil
         The glob pattern to match CSV files (e.g., 'products_export-*.csv').
     output_filename : str, optional
         The name of the output CSV file. Defaults to 'output_file.csv'.
+    dedupe : list, optional
+        Key columns (e.g. ['Handle', 'Variant SKU']); rows repeating a key are dropped.
+    keep : str, optional
+        'first' or 'last': which copy of a duplicated key to keep. Defaults to 'first'.
+    collisions_file : str, optional
+        Write the dropped duplicates (and the copy kept for each) to this CSV.
+    **kwargs
+        Passed to pandas.read_csv for every file (e.g. sep=';').
+
+    Files are streamed into the output (see csv_combine.py); columns that only
+    some files have are aligned by name, with empty cells where a file lacks them.
     """
-    csv_files = glob.glob(file_name_pattern)
+    csv_files = find_files(file_name_pattern)
 
     if not csv_files:
         print(f"No files found for pattern: {file_name_pattern}")
         return
 
-    data_frames = [pd.read_csv(file, **kwargs) for file in csv_files]
-    first_cols = set(data_frames[0].columns)
-
-    if any(set(df.columns) != first_cols for df in data_frames[1:]):
-        print("Warning: Not all files have the same columns. The final CSV may have mismatched data.")
-
-    combined_df = pd.concat(data_frames, ignore_index=True)
-    combined_df.to_csv(output_filename, index=False)
+    report = combine_csv(csv_files, output_filename, read_kwargs=kwargs, dedupe=dedupe, keep=keep)
+    print_report(report)
+    print_collisions(report, collisions_file)
     print(f"Combined {len(csv_files)} files into {output_filename}")
 
 if __name__ == "__main__":
@@ -48,9 +55,14 @@ if __name__ == "__main__":
         help="Name of the output CSV file (default: output_file.csv)"
     )
 
+    add_dedupe_args(parser)
+
     args = parser.parse_args()
 
     combine_csv_files(
         file_name_pattern=args.file_name_pattern,
-        output_filename=args.output_filename
+        output_filename=args.output_filename,
+        dedupe=dedupe_keys(args),
+        keep=args.keep,
+        collisions_file=args.collisions
     )
\ No newline at end of file
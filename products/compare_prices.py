@@ -3,21 +3,42 @@
 Compare prices between profile_products_combined.csv (original)
 and profile_products_combined_updated.csv (updated).
 
-Adds detailed logging so you can confirm:
-  • shape of both data‑frames
-  • duplicate‑key counts for Variant SKU
-  • presence of required columns
+Both files are streamed row by row, so memory stays flat for multi-hundred-MB
+catalog snapshots:
+
+  • the original is indexed by (Handle, Variant SKU, occurrence) → row hash
+    plus the compared fields; a repeated Handle+SKU pair is matched by the
+    order it appears in, so duplicates pair up deterministically
+  • each updated row whose hash matches its original is skipped without
+    parsing; otherwise the compared fields are checked as integer cents
+    ("19.9" == "19.90" == "$19.90"), with an optional --tolerance
+  • rows only in the updated file are "added", rows only in the original "removed"
+
+Rows without a Variant SKU (Shopify image rows) are not variants and are skipped.
+
+Outputs:
+  DIFF_FILE     variants whose Variant Price / Cost per item changed
+  ADDED_FILE    variants only in the updated file
+  REMOVED_FILE  variants only in the original file
 """
 
+import argparse
+import csv
+import hashlib
 import logging
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from pathlib import Path
-import pandas as pd
-from pandas.errors import MergeError
 
 # ----------------------------------------------------------------------
 ORIG_FILE    = "profile_products_combined.csv"
 UPDATED_FILE = "profile_products_combined_updated.csv"
 DIFF_FILE    = "profile_products_price_differences.csv"
+ADDED_FILE   = "profile_products_added.csv"
+REMOVED_FILE = "profile_products_removed.csv"
+
+FIELDS    = ["Variant Price", "Cost per item"]
+KEY_COLS  = ["Handle", "Variant SKU"]
+TOLERANCE = 0.0     # money differences up to this many dollars are not reported
 # ----------------------------------------------------------------------
 
 # ---- basic logging setup ---------------------------------------------------
@@ -26,82 +47,121 @@ logging.basicConfig(
     format="%(levelname)s: %(message)s"
 )
 
-def load_df(path: Path, name: str) -> pd.DataFrame:
-    """Load a product CSV with critical ID columns forced to string."""
-    logging.info(f"Loading {name} data‑frame from {path.name!r}")
-    df = pd.read_csv(
-        path,
-        dtype={
-            "Variant SKU": "string",
-            "Variant Barcode": "string",
-        },
-        keep_default_na=False
-    )
-    logging.info(f"{name} shape: {df.shape}")
-    dup = df["Variant SKU"].duplicated().sum()
-    logging.info(f"{name}: {dup:,} duplicate Variant SKU value(s)")
-    return df
+def row_hash(row: list[str]) -> bytes:
+    return hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=16).digest()
 
-def check_columns(df: pd.DataFrame, cols: list[str], name: str) -> None:
-    missing = [c for c in cols if c not in df.columns]
-    if missing:
-        raise KeyError(f"{name} is missing required column(s): {missing}")
+def to_cents(value: str):
+    """'$1,019.9' → 101990; blank stays None; text that is not money is returned stripped."""
+    text = value.strip()
+    if not text:
+        return None
+    try:
+        return int((Decimal(text.replace("$", "").replace(",", "")) * 100).quantize(1, ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):   # not a number (or NaN / Infinity)
+        return text
 
-def main() -> None:
-    cwd = Path.cwd()
-    # 1) ---------------------------------------------------------------------
-    df_orig = load_df(cwd / ORIG_FILE, "ORIGINAL")
-    df_upd  = load_df(cwd / UPDATED_FILE, "UPDATED")
+def same_value(a, b, tolerance_cents: int = 0) -> bool:
+    """Compare two to_cents() results: cents within the tolerance, anything else exactly."""
+    if isinstance(a, int) and isinstance(b, int):
+        return abs(a - b) <= tolerance_cents
+    return a == b
 
-    # quick sanity on columns we’ll use later
-    key_cols = ["Variant Price", "Cost per item"]
-    check_columns(df_orig, key_cols, "ORIGINAL")
-    check_columns(df_upd,  key_cols, "UPDATED")
+def stream_variants(path: Path, name: str, fields: list[str]):
+    """Yield ((Handle, SKU, occurrence), raw row, field values) for every row with a Variant SKU."""
+    logging.info(f"Streaming {name} rows from {path.name!r}")
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        missing = [c for c in KEY_COLS + fields if c not in header]
+        if missing:
+            raise KeyError(f"{name} is missing required column(s): {missing}")
+        h_idx, s_idx = header.index("Handle"), header.index("Variant SKU")
+        f_idx = [header.index(c) for c in fields]
+        seen, rows, skipped, dups = {}, 0, 0, 0
+        for row in reader:
+            rows += 1
+            row += [""] * (len(header) - len(row))
+            sku = row[s_idx].strip()
+            if not sku:
+                skipped += 1
+                continue
+            pair = (row[h_idx], sku)
+            n = seen.get(pair, 0)
+            seen[pair] = n + 1
+            dups += n > 0
+            yield (pair[0], pair[1], n), row, [row[i] for i in f_idx]
+    logging.info(f"{name}: {rows:,} row(s), {skipped:,} without a Variant SKU, "
+                 f"{dups:,} duplicate Handle+SKU row(s) matched by occurrence")
 
-    # 2) ---------------------------------------------------------------------
-    try:
-        merged = pd.merge(
-            df_orig,
-            df_upd,
-            on="Variant SKU",
-            suffixes=("_orig", "_upd"),
-            how="inner",
-            # validate="one_to_one"
-        )
-        logging.info(f"Merged df shape: {merged.shape}")
-    except MergeError as e:
-        logging.error("Merge failed because keys aren’t unique.")
-        logging.error(str(e))
-        logging.info(
-            "Hint: run again without 'validate=\"one_to_one\"' or "
-            "deduplicate Variant SKU values first."
-        )
-        return
+def diff_catalogs(orig_path: Path, upd_path: Path, fields=FIELDS, tolerance=TOLERANCE):
+    """Return (changed, added, removed) lists of dict rows; see the module docstring."""
+    tolerance_cents = int((Decimal(str(tolerance)) * 100).quantize(1, ROUND_HALF_UP))
+    # money is parsed once per original row, and only for updated rows whose hash moved
+    index = {key: (row_hash(row), values, [to_cents(v) for v in values])
+             for key, row, values in stream_variants(orig_path, "ORIGINAL", fields)}
+    logging.info(f"Indexed {len(index):,} original variant(s)")
 
-    # 3) ---------------------------------------------------------------------
-    price_changed = merged["Variant Price_orig"] != merged["Variant Price_upd"]
-    cost_changed  = merged["Cost per item_orig"] != merged["Cost per item_upd"]
-    any_changed   = price_changed | cost_changed
+    changed, added, unchanged = [], [], 0
+    for key, row, values in stream_variants(upd_path, "UPDATED", fields):
+        old = index.pop(key, None)
+        handle, sku, _ = key
+        if old is None:
+            added.append({"Handle": handle, "Variant SKU": sku, **dict(zip(fields, values))})
+            continue
+        old_hash, old_values, old_cents = old
+        if old_hash == row_hash(row) or all(
+            same_value(a, to_cents(b), tolerance_cents) for a, b in zip(old_cents, values)
+        ):
+            unchanged += 1
+            continue
+        record = {"Handle": handle, "Variant SKU": sku}
+        for col, a, b in zip(fields, old_values, values):
+            record[f"{col}_orig"], record[f"{col}_upd"] = a, b
+        changed.append(record)
 
-    diff_df = merged.loc[any_changed, [
-        "Variant SKU",
-        "Variant Price_orig", "Variant Price_upd",
-        "Cost per item_orig", "Cost per item_upd",
-    ]]
+    removed = [{"Handle": handle, "Variant SKU": sku, **dict(zip(fields, values))}
+               for (handle, sku, _), (_, values, _) in index.items()]
+    logging.info(f"{unchanged:,} variant(s) with unchanged prices")
+    return changed, added, removed
 
-    # 4) ---------------------------------------------------------------------
-    diff_df.to_csv(cwd / DIFF_FILE, index=False)
+def write_rows(path: Path, rows: list[dict], columns: list[str]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
 
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Diff Variant Price / Cost per item between two Shopify exports.")
+    ap.add_argument("original", nargs="?", default=ORIG_FILE)
+    ap.add_argument("updated", nargs="?", default=UPDATED_FILE)
+    ap.add_argument("--fields", nargs="+", default=FIELDS, help="Columns to compare")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE,
+                    help="Ignore money differences up to this many dollars, e.g. 0.01 (default: exact to the cent)")
+    ap.add_argument("--diff-file", default=DIFF_FILE)
+    ap.add_argument("--added-file", default=ADDED_FILE)
+    ap.add_argument("--removed-file", default=REMOVED_FILE)
+    args = ap.parse_args()
+
+    # 1) ---------------------------------------------------------------------
+    changed, added, removed = diff_catalogs(Path(args.original), Path(args.updated), args.fields, args.tolerance)
+
+    # 2) ---------------------------------------------------------------------
+    diff_cols = KEY_COLS + [f"{c}_{s}" for c in args.fields for s in ("orig", "upd")]
+    write_rows(Path(args.diff_file), changed, diff_cols)
+    write_rows(Path(args.added_file), added, KEY_COLS + args.fields)
+    write_rows(Path(args.removed_file), removed, KEY_COLS + args.fields)
+
+    # 3) ---------------------------------------------------------------------
     logging.info(
-        f"Found {len(diff_df):,} product(s) with different Variant Price "
-        f"or Cost per item."
+        f"Found {len(changed):,} product(s) with different "
+        f"{' or '.join(args.fields)}; {len(added):,} added, {len(removed):,} removed."
     )
-    logging.info(f"Details written to {DIFF_FILE!r}")
+    logging.info(f"Details written to {args.diff_file!r}, {args.added_file!r}, {args.removed_file!r}")
 
-    if not diff_df.empty:
+    if changed:
         logging.info("\nFirst few differences:\n%s",
-                     diff_df.to_string(index=False))
+                     "\n".join(", ".join(r.values()) for r in changed[:10]))
 
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,40 +3,38 @@
 A module/script that finds CSV files matching a pattern and concatenates them into one DataFrame.
 """
 
-import os
-import glob
 import pandas as pd
 import argparse
 
-def concat_csv_files(pattern="planet_waves_products*.csv", output_file="concatenated.csv"):
+from csv_combine import add_dedupe_args, combine_csv, dedupe_keys, find_files, print_collisions, print_report
+
+def concat_csv_files(pattern="planet_waves_products*.csv", output_file="concatenated.csv", load_result=True,
+                     dedupe=None, keep="first", collisions_file=None):
     """
     Find all CSV files matching the given `pattern`, concatenate them, and save to `output_file`.
-    Returns the resulting DataFrame for further use if imported as a module.
+    Returns the resulting DataFrame for further use if imported as a module
+    (read back from `output_file`; pass load_result=False to skip that and get None).
+    With `dedupe` (key columns, e.g. ['Handle', 'Variant SKU']) rows repeating a key
+    are dropped, keeping the `keep`="first" or "last" copy.
     """
     # Search for all files matching the pattern
-    csv_files = glob.glob(pattern)
+    csv_files = find_files(pattern)
 
     if not csv_files:
         print(f"No files found for pattern: {pattern}")
         return pd.DataFrame()  # Return empty DF if no files found
 
-    # Read each file into a list of DataFrames
-    dataframes = []
+    # Stream every file into the output, aligning columns by name
     for csv_file in csv_files:
         print(f"Reading {csv_file}")
-        df = pd.read_csv(csv_file)
-        dataframes.append(df)
-
-    # Concatenate all DataFrames
-    concatenated_df = pd.concat(dataframes, ignore_index=True)
+    report = combine_csv(csv_files, output_file, dedupe=dedupe, keep=keep)
+    print_report(report)
+    print_collisions(report, collisions_file)
     print(f"Concatenated {len(csv_files)} files.")
-
-    # Save the result
-    concatenated_df.to_csv(output_file, index=False)
     print(f"Saved concatenated DataFrame to: {output_file}")
 
     # Return the DataFrame in case this function is imported and called elsewhere
-    return concatenated_df
+    return pd.read_csv(output_file) if load_result else None
 
 def main():
     """
@@ -56,9 +54,11 @@ def main():
         default="concatenated.csv",
         help="Name of the output CSV file (default: concatenated.csv)."
     )
+    add_dedupe_args(parser)
 
     args = parser.parse_args()
-    concat_csv_files(pattern=args.pattern, output_file=args.output)
+    concat_csv_files(pattern=args.pattern, output_file=args.output, load_result=False,
+                     dedupe=dedupe_keys(args), keep=args.keep, collisions_file=args.collisions)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+csv_combine.py – combine many CSV exports into one file without holding them all in memory.
+
+Used by combine_csv_files.py and concat_csv.py:
+
+    combine_csv(["products_export-1.csv", "products_export-2.csv"], "all_products.csv")
+
+  • Schemas are checked up front from the header lines only; files with different
+    columns are aligned on the union of all headers (missing cells left empty),
+    or rejected with strict=True.
+  • Files are read concurrently in a thread pool (a few files ahead of the writer)
+    and appended to the output in order, so memory is bounded by the look-ahead,
+    not by the size of the combined catalog.
+  • A file whose header already matches the output is copied byte-for-byte; only
+    misaligned files are parsed (all cells as text, so values are never reformatted).
+  • Overlapping exports can be deduplicated on key columns (Handle + Variant SKU
+    by default), keeping the first or the last copy of each key:
+
+    report = combine_csv(files, "all_products.csv", dedupe=DEDUPE_KEYS, keep="last")
+    report.collisions      # one row per dropped duplicate and the copy that was kept
+
+    Rows with a blank key part (image-only rows, variants without a SKU) are
+    never treated as duplicates. Only the key columns are read to find the
+    duplicates; files without any are still copied byte-for-byte.
+"""
+
+import argparse
+import csv
+import glob
+import io
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+ENCODING = "utf-8-sig"
+DEDUPE_KEYS = ["Handle", "Variant SKU"]
+KEEP = {"first", "last"}
+
+
+@dataclass
+class SchemaReport:
+    columns: list                                  # union of all headers, in first-seen order
+    missing: dict = field(default_factory=dict)    # file -> columns it lacks
+    extra: dict = field(default_factory=dict)      # file -> columns the first file lacks
+    collisions: pd.DataFrame = None                # dropped duplicates (when deduplicating)
+
+    @property
+    def aligned(self) -> bool:
+        return not self.missing and not self.extra
+
+
+def natural_key(path) -> list:
+    """Sort products_export-2.csv before products_export-10.csv."""
+    return [int(t) if t.isdigit() else t.lower() for t in re.split(r"(\d+)", str(path))]
+
+
+def find_files(pattern: str) -> list:
+    return sorted(glob.glob(pattern), key=natural_key)
+
+
+def _read(path, read_kwargs, **opts) -> pd.DataFrame:
+    return pd.read_csv(path, **{"dtype": str, "keep_default_na": False, "encoding": ENCODING, **opts, **read_kwargs})
+
+
+def read_header(path, read_kwargs: dict = None):
+    """(header columns, byte offset where the data rows start, line ending); handles quoted newlines.
+
+    With `read_kwargs` (e.g. sep=';') the columns come from pd.read_csv with the
+    same options as the data, so header and rows are always tokenized alike.
+    """
+    with open(path, "rb") as f:
+        raw, in_quotes = b"", False
+        for line in f:
+            raw += line
+            if line.count(b'"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                break
+    eol = "\r\n" if raw.endswith(b"\r\n") else "\n"
+    text = raw.decode(ENCODING)
+    if not text.strip():
+        return [], len(raw), eol
+    if read_kwargs:
+        return list(_read(path, read_kwargs, nrows=0).columns), len(raw), eol
+    return next(csv.reader(io.StringIO(text, newline=""))), len(raw), eol
+
+
+def check_schemas(headers: dict, strict: bool = False) -> SchemaReport:
+    """Compare every file's header with the first one; `headers` maps file -> column list."""
+    files = list(headers)
+    first = headers[files[0]]
+    columns = list(first)
+    report = SchemaReport(columns)
+    for f in files:
+        for col in headers[f]:
+            if col not in columns:
+                columns.append(col)
+    for f in files:
+        have = set(headers[f])
+        missing = [c for c in columns if c not in have]
+        extra = [c for c in headers[f] if c not in set(first)]
+        if missing:
+            report.missing[f] = missing
+        if extra:
+            report.extra[f] = extra
+    if strict and not report.aligned:
+        raise ValueError(f"CSV headers differ: missing {report.missing}, extra {report.extra}")
+    return report
+
+
+def _read_keys(path, header, keys, read_kwargs) -> pd.DataFrame:
+    present = [k for k in keys if k in header]
+    if not present:     # no key columns at all: every row is a pass-through
+        n = len(_read(path, read_kwargs, usecols=[0]))
+        return pd.DataFrame("", index=range(n), columns=keys)
+    return _read(path, read_kwargs, usecols=present).reindex(columns=keys, fill_value="")
+
+
+def find_duplicates(key_frames: dict, keys: list, keep: str = "first"):
+    """(file -> keep mask or None if nothing is dropped, collision report) for per-file key frames.
+
+    A row whose key columns are all non-blank is dropped when the same key
+    appears earlier (keep="first") or later (keep="last") in the file order.
+    """
+    if keep not in KEEP:
+        raise ValueError(f"keep must be one of {sorted(KEEP)}")
+    rows = pd.concat(
+        [kf.assign(file=f, row=np.arange(1, len(kf) + 1)) for f, kf in key_frames.items()],
+        ignore_index=True,
+    )
+    keyed = rows[keys].apply(lambda c: c.str.strip().ne("")).all(axis=1)
+    dropped = keyed & rows.duplicated(keys, keep=keep)
+
+    kept = rows[keyed & ~dropped].rename(columns={"file": "kept_file", "row": "kept_row"})
+    collisions = (rows[dropped].rename(columns={"file": "dropped_file", "row": "dropped_row"})
+                  .merge(kept, on=keys, how="left")
+                  [keys + ["kept_file", "kept_row", "dropped_file", "dropped_row"]])
+
+    masks, start = {}, 0
+    for f, kf in key_frames.items():
+        drop = dropped.to_numpy()[start:start + len(kf)]
+        masks[f] = ~drop if drop.any() else None
+        start += len(kf)
+    return masks, collisions
+
+
+def _chunk(path, header, body_start, file_eol, columns, eol, read_kwargs, mask=None) -> bytes:
+    """The data rows of one file (those in `mask`, if given), laid out on `columns`, as bytes ready to append.
+
+    Rows are copied as raw bytes only when the file already has the output's
+    columns and line ending; anything else is re-serialized with `eol`.
+    """
+    if header == columns and file_eol == eol and not read_kwargs and mask is None:
+        with open(path, "rb") as f:
+            f.seek(body_start)
+            body = f.read()
+        return body if not body or body.endswith(b"\n") else body + eol.encode()
+    df = _read(path, read_kwargs)
+    if mask is not None:
+        df = df[mask]
+    df = df.reindex(columns=columns, fill_value="")
+    return df.to_csv(index=False, header=False, lineterminator=eol).encode("utf-8")
+
+
+def combine_csv(files, output, workers: int = 4, strict: bool = False, read_kwargs: dict = None,
+                dedupe: list = None, keep: str = "first") -> SchemaReport:
+    """Append `files` (in order) into `output` on the union of their headers; returns the schema report.
+
+    `read_kwargs` are passed to pd.read_csv and force every file through the parser
+    (e.g. a different `sep`); by default matching files are copied as raw bytes.
+    With `dedupe` (a list of key columns), rows repeating a key are dropped,
+    keeping the `keep`="first" or "last" copy; see report.collisions.
+    The output uses the first file's line ending (LF or CRLF) throughout.
+    """
+    read_kwargs = read_kwargs or {}
+    meta = {str(f): read_header(f, read_kwargs) for f in files}
+    files = [f for f, (header, _, _) in meta.items() if header]     # empty files add nothing
+    if not files:
+        raise ValueError("no non-empty CSV files to combine")
+    report = check_schemas({f: meta[f][0] for f in files}, strict=strict)
+
+    with open(output, "w", newline="", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        masks = dict.fromkeys(files)
+        if dedupe:
+            # pass 1: key columns only, so memory stays at a few strings per row
+            key_frames = dict(zip(files, pool.map(lambda f: _read_keys(f, meta[f][0], dedupe, read_kwargs), files)))
+            masks, report.collisions = find_duplicates(key_frames, list(dedupe), keep)
+            del key_frames
+
+        eol = meta[files[0]][2]
+        csv.writer(out, lineterminator=eol).writerow(report.columns)
+        out.flush()
+        pending = deque()
+        for f in files:
+            pending.append(pool.submit(_chunk, f, *meta[f], report.columns, eol, read_kwargs, masks[f]))
+            if len(pending) > workers:          # bounded look-ahead keeps memory flat
+                out.buffer.write(pending.popleft().result())
+        while pending:
+            out.buffer.write(pending.popleft().result())
+    return report
+
+
+def print_report(report: SchemaReport) -> None:
+    if report.aligned:
+        return
+    print("Warning: Not all files have the same columns; they were aligned on the union of all headers.")
+    for f, cols in report.missing.items():
+        print(f"  {f}: missing {cols} (left empty)")
+    for f, cols in report.extra.items():
+        print(f"  {f}: extra {cols}")
+
+
+def print_collisions(report: SchemaReport, path=None) -> None:
+    """Summarize dropped duplicates; write the full collision report to `path` if given."""
+    collisions = report.collisions
+    if collisions is None:
+        return
+    print(f"Dropped {len(collisions)} duplicate row(s)")
+    for f, n in collisions["dropped_file"].value_counts(sort=False).items():
+        print(f"  {f}: {n}")
+    if path:
+        collisions.to_csv(path, index=False)
+        print(f"Collision report written to: {path}")
+
+
+def add_dedupe_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--dedupe", action="store_true",
+                        help=f"Drop rows repeating a key (default key: {' + '.join(DEDUPE_KEYS)})")
+    parser.add_argument("--key", action="append", help="Key column for --dedupe (repeatable)")
+    parser.add_argument("--keep", choices=sorted(KEEP), default="first", help="Which copy of a duplicate to keep")
+    parser.add_argument("--collisions", help="Write every dropped duplicate to this CSV")
+
+
+def dedupe_keys(args):
+    """Key list for combine_csv(dedupe=...) from add_dedupe_args options (None when not deduplicating)."""
+    return (args.key or DEDUPE_KEYS) if args.dedupe or args.key else None
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Combine CSV files matching a pattern into one CSV, streaming.")
+    ap.add_argument("pattern", help="Glob pattern, e.g. 'products_export-*.csv'")
+    ap.add_argument("output", nargs="?", default="output_file.csv")
+    ap.add_argument("--workers", type=int, default=4, help="Files read concurrently (default: 4)")
+    ap.add_argument("--strict", action="store_true", help="Fail instead of aligning when headers differ")
+    add_dedupe_args(ap)
+    args = ap.parse_args()
+
+    files = find_files(args.pattern)
+    if not files:
+        print(f"No files found for pattern: {args.pattern}")
+        return
+    report = combine_csv(files, args.output, workers=args.workers, strict=args.strict,
+                         dedupe=dedupe_keys(args), keep=args.keep)
+    print_report(report)
+    print_collisions(report, args.collisions)
+    print(f"Combined {len(files)} files into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+price_engine.py – one vectorized way to push supplier prices into a Shopify catalog.
+
+Every updater (update_prices.py, update_stentor_products.py,
+update_shopify_prices.py, webscraping/update_prices_daddario.py) describes
+its supplier list with a PriceSource and calls apply_price_updates():
+
+    source = PriceSource(
+        key="Variant SKU",            # catalog column to match on
+        source_key="Model",           # price-list column to match on
+        fields={"Cost per item": "Dealer Price", "Variant Price": "MAP"},
+        skip_blank=True,              # blank / NaN price-list cells leave the catalog alone
+        skip_zero=False,              # 0 price-list cells leave the catalog alone
+    )
+    result = apply_price_updates(catalog, price_list, source)
+
+Matching is a hash lookup per field (Series.map), so the cost is a handful of
+column operations no matter how many variants the catalog has.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class PriceSource:
+    key: str
+    source_key: str
+    fields: dict
+    skip_blank: bool = True
+    skip_zero: bool = False
+    name: str = "supplier"
+
+
+@dataclass
+class PriceUpdate:
+    catalog: pd.DataFrame      # updated copy of the catalog
+    applied: pd.Series         # row took at least one value from the price list
+    changed: pd.Series         # row has at least one field whose value actually changed
+    changes: pd.DataFrame      # one row per changed cell: row, key, field, old, new
+    fields_applied: dict = field(default_factory=dict)   # catalog column -> rows that took a value
+
+
+CHANGE_COLS = ["row", "key", "field", "old", "new"]
+
+
+def _usable(values: pd.Series, skip_blank: bool, skip_zero: bool) -> pd.Series:
+    """Mask of looked-up price-list values that should overwrite the catalog."""
+    use = values.notna()
+    if skip_blank:
+        use &= values.astype("string").str.strip().fillna("").ne("")
+    if skip_zero:
+        use &= pd.to_numeric(values, errors="coerce").ne(0)
+    return use
+
+
+def _differs(old: pd.Series, new: pd.Series) -> pd.Series:
+    """Element-wise !=, treating two missing values as equal."""
+    new = new.reindex(old.index)
+    old_na, new_na = old.isna().to_numpy(), new.isna().to_numpy()
+    # compare as plain objects with missing values masked out (pd.NA has no truth value)
+    present = ~old_na & ~new_na
+    same = np.zeros(len(old), dtype=bool)
+    same[present] = old.to_numpy(object)[present] == new.to_numpy(object)[present]
+    return pd.Series(~(same | (old_na & new_na)), index=old.index)
+
+
+def apply_price_updates(catalog: pd.DataFrame, prices: pd.DataFrame, source: PriceSource,
+                        locked: dict = None) -> PriceUpdate:
+    """Copy price-list values into `catalog` according to `source`; the input frames are not modified.
+
+    Duplicate keys in the price list resolve to their first occurrence and blank
+    keys are ignored. Catalog columns named in `source.fields` are created
+    (empty) if missing. `locked` maps a catalog column to a boolean mask of rows
+    this source must leave alone (cells already set by a higher-priority source).
+    """
+    out = catalog.copy()
+    src_keys = prices[source.source_key]
+    lookup = (
+        prices[src_keys.notna() & src_keys.astype("string").str.strip().ne("")]   # blank keys never match
+        .drop_duplicates(subset=source.source_key, keep="first")
+        .set_index(source.source_key)
+    )
+    keys = out[source.key]
+
+    applied = pd.Series(False, index=out.index)
+    changed = pd.Series(False, index=out.index)
+    changes = []
+    fields_applied = {}
+
+    for col, src in source.fields.items():
+        if src not in lookup.columns:
+            continue
+        if col not in out.columns:
+            out[col] = pd.NA
+        new = keys.map(lookup[src])
+        use = _usable(new, source.skip_blank, source.skip_zero)
+        if locked and col in locked:
+            use &= ~locked[col].reindex(out.index, fill_value=False)
+        old = out[col]
+        diff = use & _differs(old, new)
+
+        if diff.any():
+            changes.append(pd.DataFrame({
+                "row": out.index[diff],
+                "key": keys[diff].to_numpy(),
+                "field": col,
+                "old": old[diff].to_numpy(),
+                "new": new[diff].to_numpy(),
+            }))
+        if use.any():
+            if out[col].dtype != new.dtype:
+                out[col] = out[col].astype(object)
+            out.loc[use, col] = new[use]
+        applied |= use
+        fields_applied[col] = use
+        changed |= diff
+
+    changes = pd.concat(changes, ignore_index=True) if changes else pd.DataFrame(columns=CHANGE_COLS)
+    return PriceUpdate(out, applied, changed, changes, fields_applied)
+
+
+# ----------------------------------------------------------------------
+# Diff-only Shopify imports
+# Shopify matches an imported row to a variant by Handle + option values, so
+# those columns always go along with the changed price fields.
+IMPORT_KEYS = ["Handle", "Option1 Value", "Option2 Value", "Option3 Value", "Variant SKU"]
+
+
+def diff_import(before: pd.DataFrame, after: pd.DataFrame, fields, key_cols=IMPORT_KEYS) -> pd.DataFrame:
+    """Rows of `after` whose price `fields` differ from `before` (compared as numbers).
+
+    Only the key columns present and the fields that changed somewhere are kept.
+    """
+    fields = [c for c in fields if c in after.columns]
+    changed = {}
+    for col in fields:
+        old = before[col] if col in before.columns else pd.Series(pd.NA, index=after.index)
+        changed[col] = _differs(pd.to_numeric(old, errors="coerce"), pd.to_numeric(after[col], errors="coerce"))
+    if not changed:
+        return after.iloc[:0][[c for c in key_cols if c in after.columns]]
+    rows = pd.concat(changed, axis=1).any(axis=1)
+    cols = [c for c in key_cols if c in after.columns] + [c for c in fields if changed[c].any()]
+    return after.loc[rows, cols]
+
+
+def write_import_files(df: pd.DataFrame, output_file, max_rows: int = None) -> list:
+    """Write `df` to `output_file`, or to <stem>_partNNN.csv files of at most `max_rows` rows.
+
+    A product's rows are never split across two files (a Handle with more
+    than `max_rows` changed variants gets a file of its own).
+    """
+    output_file = Path(output_file)
+    if not max_rows or len(df) <= max_rows:
+        df.to_csv(output_file, index=False)
+        return [output_file]
+
+    handles = df["Handle"] if "Handle" in df.columns else pd.Series(range(len(df)), index=df.index)
+    parts, current, size = [], [], 0
+    for _, group in df.groupby(handles.to_numpy(), sort=False, dropna=False):   # rows without a Handle stay too
+        if current and size + len(group) > max_rows:
+            parts.append(pd.concat(current))
+            current, size = [], 0
+        current.append(group)
+        size += len(group)
+    parts.append(pd.concat(current))
+
+    paths = []
+    for i, part in enumerate(parts, 1):
+        path = output_file.with_name(f"{output_file.stem}_part{i:03d}{output_file.suffix}")
+        part.to_csv(path, index=False)
+        paths.append(path)
+    return paths
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+price_ledger.py – append-only history of every price/cost change the updaters make.
+
+update_prices.py, update_stentor_products.py, update_shopify_prices.py,
+webscraping/update_prices_daddario.py and price_sync.py append each changed
+cell (SKU, Handle, field, old, new, source, timestamp) to one SQLite file,
+products/price_ledger.sqlite (wherever they are run from) unless PRICE_LEDGER
+points elsewhere.
+Rows are never updated or deleted; lookups by SKU and by time range are indexed.
+
+    python price_ledger.py history DAD-EJ16                 # when did this SKU's price/cost change?
+    python price_ledger.py changes --since 2025-01-01 --source stentor
+    python price_ledger.py export ledger_2025.parquet --since 2025-01-01   # .csv or .parquet
+"""
+
+import argparse
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+# next to this file, so scripts run from products/ and webscraping/ share one ledger
+DEFAULT_LEDGER = os.environ.get("PRICE_LEDGER") or str(Path(__file__).resolve().parent / "price_ledger.sqlite")
+
+DDL = """
+CREATE TABLE IF NOT EXISTS price_changes (
+    sku TEXT NOT NULL,
+    handle TEXT,
+    field TEXT NOT NULL,
+    old REAL,
+    new REAL,
+    source TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_price_changes_sku ON price_changes (sku, recorded_at);
+CREATE INDEX IF NOT EXISTS ix_price_changes_time ON price_changes (recorded_at);
+"""
+
+LEDGER_COLS = ["SKU", "Handle", "Field", "Old", "New", "Source", "RecordedAt"]
+
+
+def _money(values) -> list:
+    return [None if pd.isna(v) else float(v) for v in pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")]
+
+
+class PriceLedger:
+    """SQLite ledger of price changes, one row per changed cell."""
+
+    def __init__(self, path=DEFAULT_LEDGER):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.executescript(DDL)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, changes: pd.DataFrame, source: str, catalog: pd.DataFrame = None) -> int:
+        """Append a PriceUpdate.changes frame (row, key, field, old, new); Handle is taken from `catalog` if given."""
+        if changes.empty:
+            return 0
+        ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        handles = (catalog["Handle"].reindex(changes["row"]).tolist()
+                   if catalog is not None and "Handle" in catalog.columns else [None] * len(changes))
+        rows = [row for row in zip(changes["key"].astype(str), handles, changes["field"],
+                                   _money(changes["old"]), _money(changes["new"]),
+                                   [source] * len(changes), [ts] * len(changes))
+                if row[3] != row[4]]   # "10.00" -> 10.0 is a rewrite, not a price change
+        with self.conn:
+            self.conn.executemany("INSERT INTO price_changes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _query(self, where: list, params: list) -> pd.DataFrame:
+        sql = "SELECT sku, handle, field, old, new, source, recorded_at FROM price_changes"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self.conn.execute(sql + " ORDER BY recorded_at, rowid", params).fetchall()
+        return pd.DataFrame(rows, columns=LEDGER_COLS)
+
+    def changes(self, since=None, until=None, source=None, field=None) -> pd.DataFrame:
+        """Every change in [since, until) (ISO dates/timestamps, UTC), optionally for one source/field."""
+        where, params = [], []
+        for clause, value in (("recorded_at >= ?", since), ("recorded_at < ?", until),
+                              ("source = ?", source), ("field = ?", field)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        return self._query(where, params)
+
+    def history(self, sku, since=None, until=None) -> pd.DataFrame:
+        where, params = ["sku = ?"], [str(sku)]
+        if since is not None:
+            where.append("recorded_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("recorded_at < ?")
+            params.append(until)
+        return self._query(where, params)
+
+
+def record_update(result, source: str, path=DEFAULT_LEDGER) -> int:
+    """Append a PriceUpdate's changes to the ledger at `path` (no-op when nothing changed)."""
+    if result.changes.empty:
+        return 0
+    with PriceLedger(path) as ledger:
+        return ledger.record(result.changes, source, result.catalog)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Query the price change ledger written by the product updaters.")
+    ap.add_argument("--ledger", default=DEFAULT_LEDGER, help=f"Ledger file (default: {DEFAULT_LEDGER})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    hist = sub.add_parser("history", help="Every recorded change for a SKU")
+    hist.add_argument("sku")
+    chg = sub.add_parser("changes", help="Changes in a time range")
+    exp = sub.add_parser("export", help="Write changes in a time range to .csv or .parquet")
+    exp.add_argument("output")
+    for p in (hist, chg, exp):
+        p.add_argument("--since", help="ISO date/time, inclusive (UTC)")
+        p.add_argument("--until", help="ISO date/time, exclusive (UTC)")
+    for p in (chg, exp):
+        p.add_argument("--source", help="Only changes from this updater (e.g. stentor, profile)")
+        p.add_argument("--field", help="Only this column (e.g. 'Cost per item')")
+    args = ap.parse_args()
+
+    with PriceLedger(args.ledger) as ledger:
+        if args.cmd == "history":
+            df = ledger.history(args.sku, args.since, args.until)
+        else:
+            df = ledger.changes(args.since, args.until, args.source, args.field)
+        if args.cmd == "export":
+            if args.output.endswith(".parquet"):
+                df.to_parquet(args.output, index=False)
+            else:
+                df.to_csv(args.output, index=False)
+            print(f"Exported {len(df)} change(s) to {args.output}")
+        else:
+            print(df.to_string(index=False) if not df.empty else "No changes recorded.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+price_sync.py – apply several supplier price lists to one Shopify export in a single pass.
+
+Instead of running update_shopify_prices.py, update_stentor_products.py,
+update_prices.py and webscraping/update_prices_daddario.py one after another
+(each re-reading and re-writing the full catalog), load the catalog once,
+apply every source in order and write one output:
+
+    python price_sync.py products_export.csv \\
+        --source stentor=stentor_pricelist.csv \\
+        --source daddario=daddario_pricelist_2025.csv \\
+        --source shopify=yamaha_products1_output.csv \\
+        --output products_export_synced.csv --log-dir sync_logs
+
+Precedence: with the default `--precedence first`, the earliest --source that
+sets a cell wins and later sources leave that cell alone. `--precedence last`
+lets later sources overwrite earlier ones, which is what running the scripts
+one after another used to do.
+
+Each supplier's cell-level changes are written to <log-dir>/<supplier>_changes.csv.
+With --diff-only the output holds just the changed variants (Handle/option/SKU
+keys plus the changed price fields), split into --max-rows sized files if given.
+Every change is also appended to the price ledger (see price_ledger.py).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from price_engine import IMPORT_KEYS, apply_price_updates, diff_import, write_import_files
+from price_ledger import DEFAULT_LEDGER, PriceLedger
+from shopify_export import ShopifyExport
+from supplier_lists import load_price_list
+from update_prices import PROFILE_SOURCE
+from update_shopify_prices import read_price_file, price_file_source
+from update_stentor_products import STENTOR_SOURCE
+
+# the D'Addario updater lives with the webscrapers
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "webscraping"))
+from update_prices_daddario import DADDARIO_SOURCE
+
+
+def _shopify_prices(path):
+    df = read_price_file(path)
+    return df, price_file_source(df)
+
+
+# supplier name -> loader(path) returning (price list, PriceSource)
+SUPPLIERS = {
+    "profile":  lambda path: (load_price_list(path, "profile"), PROFILE_SOURCE),
+    "stentor":  lambda path: (load_price_list(path, "stentor"), STENTOR_SOURCE),
+    "daddario": lambda path: (load_price_list(path, "daddario"), DADDARIO_SOURCE),
+    "shopify":  _shopify_prices,
+}
+
+ID_COLS = ["Variant SKU", "Variant Barcode"]
+
+
+def read_catalog(path, fields) -> ShopifyExport:
+    """The export's key, ID and price `fields` columns; everything else is copied verbatim on write."""
+    return ShopifyExport(path, columns=IMPORT_KEYS + ID_COLS + list(fields))
+
+
+def sync_prices(catalog: pd.DataFrame, sources, precedence: str = "first"):
+    """Apply `sources` – a list of (name, price list, PriceSource) – in order.
+
+    Returns the synced catalog and {name: PriceUpdate}. Catalog price columns
+    touched by any source are compared as numbers, so "10.00" vs 10.0 is not a change.
+    """
+    if precedence not in ("first", "last"):
+        raise ValueError(f"precedence must be 'first' or 'last', not {precedence!r}")
+    out = catalog.copy()
+    for col in {c for _, _, src in sources for c in src.fields}:
+        if col in out.columns:
+            out[col] = pd.to_numeric(out[col], errors="coerce")
+
+    locked, results = {}, {}
+    for name, prices, source in sources:
+        result = apply_price_updates(out, prices, source, locked if precedence == "first" else None)
+        out = result.catalog
+        for col, use in result.fields_applied.items():
+            locked[col] = locked.get(col, pd.Series(False, index=out.index)) | use
+        results[name] = result
+    return out, results
+
+
+def write_change_log(result, catalog: pd.DataFrame, path: Path) -> None:
+    log = result.changes.copy()
+    if "Handle" in catalog.columns:
+        log.insert(1, "Handle", catalog["Handle"].reindex(log["row"]).to_numpy())
+    log.to_csv(path, index=False)
+
+
+def parse_source(arg: str):
+    name, sep, path = arg.partition("=")
+    if not sep or name not in SUPPLIERS:
+        raise argparse.ArgumentTypeError(f"expected SUPPLIER=FILE with SUPPLIER one of {sorted(SUPPLIERS)}")
+    return name, path
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Apply several supplier price lists to a Shopify export in one pass.")
+    ap.add_argument("catalog", help="Shopify products export (CSV)")
+    ap.add_argument("--source", dest="sources", type=parse_source, action="append", required=True,
+                    metavar="SUPPLIER=FILE", help=f"Price list to apply, in order; SUPPLIER is one of {sorted(SUPPLIERS)}")
+    ap.add_argument("--precedence", choices=["first", "last"], default="first",
+                    help="Which source wins when two set the same cell (default: first)")
+    ap.add_argument("--output", help="Output CSV (default: <catalog>_synced.csv)")
+    ap.add_argument("--log-dir", default="sync_logs", help="Folder for the per-supplier change logs")
+    ap.add_argument("--ledger", default=DEFAULT_LEDGER, help=f"Price ledger to append changes to (default: {DEFAULT_LEDGER})")
+    ap.add_argument("--diff-only", action="store_true",
+                    help="Write only changed variants: key columns plus the changed price fields")
+    ap.add_argument("--max-rows", type=int, help="With --diff-only, split the import into files of at most this many rows")
+    args = ap.parse_args()
+
+    catalog_path = Path(args.catalog)
+    output = Path(args.output or catalog_path.with_name(f"{catalog_path.stem}_synced.csv"))
+    log_dir = Path(args.log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    # 1) Load every price list (from the supplier_lists cache where possible) and the
+    #    catalog once, just the columns the sources can touch
+    sources, labels = [], set()
+    for name, path in args.sources:
+        label = name if name not in labels else f"{name}_{len(sources) + 1}"   # e.g. two shopify files
+        labels.add(label)
+        sources.append((label, *SUPPLIERS[name](path)))
+    fields = list(dict.fromkeys(c for _, _, src in sources for c in src.fields))
+    export = read_catalog(catalog_path, fields)
+    catalog = export.df
+
+    # 2) Apply them in order
+    synced, results = sync_prices(catalog, sources, args.precedence)
+
+    # 3) One output, one change log per supplier
+    if args.diff_only:
+        changes = diff_import(catalog, synced, fields)
+        outputs = write_import_files(changes, output, args.max_rows)
+    else:
+        export.write(output, synced)     # untouched rows stay byte-for-byte
+        outputs = [output]
+    print(f"Catalog: {len(catalog)} row(s) from {catalog_path}")
+    with PriceLedger(args.ledger) as ledger:
+        for name, result in results.items():
+            log_path = log_dir / f"{name}_changes.csv"
+            write_change_log(result, synced, log_path)
+            ledger.record(result.changes, name, synced)
+            print(f"  {name:<9} matched {int(result.applied.sum())} row(s), changed {len(result.changes)} cell(s) -> {log_path}")
+    if args.diff_only:
+        print(f"Diff import: {len(changes)} changed row(s) written to {', '.join(map(str, outputs))}")
+    else:
+        print(f"Synced catalog written to {output}")
+
+
+if __name__ == "__main__":
+    main()
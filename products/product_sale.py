@@ -1,34 +1,35 @@
 #!/usr/bin/env python3
 """
 product_sale.py – mark products “on-sale”, set type to Clearance, copy
-Variant Price ➜ Variant Compare At Price, and discount Variant Price by 15 %.
+Variant Price ➜ Variant Compare At Price, and discount Variant Price by 10 %.
 
 USAGE
 -----
     python product_sale.py input.csv
     python product_sale.py input.csv -o output.csv
+    python product_sale.py input.csv --dry-run
 
 If -o/--output is omitted, the script writes <input>_updated.csv
 in the same directory as the source file.
+
+The sale itself is one rule for promotions.py; for other discounts, filters
+or .99 price points write a rule file and run promotions.py directly.
 """
 
 from pathlib import Path
 import argparse
 import sys
 
-import pandas as pd
-
-
-# ----------------------------- helpers -------------------------------- #
-def add_onsale(tags_cell: str) -> str:
-    """Ensure the tag list contains 'on-sale' (handles NaN / empty)."""
-    if pd.isna(tags_cell) or not str(tags_cell).strip():
-        return "on-sale"
+from promotions import run_sale
 
-    tags_list = [t.strip() for t in str(tags_cell).split(",") if t.strip()]
-    if "on-sale" not in tags_list:
-        tags_list.append("on-sale")
-    return ",".join(tags_list)
+# The clearance sale as a promotions.py rule
+CLEARANCE_SALE = [{
+    "name": "clearance 10% off",
+    "discount": 10,
+    "compare_at": "set",        # Variant Price ➜ Variant Compare At Price
+    "set_type": "Clearance",
+    "add_tags": ["on-sale"],
+}]
 
 
 # ------------------------------ main ---------------------------------- #
@@ -47,6 +48,11 @@ def main() -> None:
         help="Where to write the transformed CSV "
              "(default: <input>_updated.csv next to the source)"
     )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only print how many variants/products the sale touches"
+    )
 
     args = parser.parse_args()
     inp: Path = args.input
@@ -55,32 +61,8 @@ def main() -> None:
     if not inp.is_file():
         sys.exit(f"Error: {inp} does not exist or is not a file.")
 
-    # Read with Variant SKU / Barcode preserved as strings
-    df = pd.read_csv(
-        inp,
-        dtype={
-            "Variant SKU": str,
-            "Variant Barcode": str
-        }
-    )
-
-    # 1. Tag products as on-sale
-    df["Tags"] = df["Tags"].apply(add_onsale)
-
-    # 2. Set Type to Clearance
-    df["Type"] = "Clearance"
-
-    # 3. Copy Variant Price ➜ Variant Compare At Price
-    df["Variant Compare At Price"] = df["Variant Price"]
-
-    # 4. Discount Variant Price by 10 %
-    df["Variant Price"] = pd.to_numeric(
-        df["Variant Price"], errors="coerce"
-    ) * 0.9
-
-    # 5. Write result
-    df.to_csv(out, index=False)
-    print(f"✅  Updated CSV written to: {out}")
+    # Tag on-sale, set Type, copy price to Compare At and discount – one vectorized pass
+    run_sale(inp, out, CLEARANCE_SALE, dry_run=args.dry_run)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+promotions.py – apply a sale described in a JSON rule file to a Shopify export in one pass.
+
+USAGE
+-----
+    python promotions.py input.csv rules.json
+    python promotions.py input.csv rules.json -o output.csv
+    python promotions.py input.csv rules.json --dry-run      # summary only, nothing written
+
+Rule file
+---------
+    {
+      "rules": [
+        {
+          "name": "Boss pedals 20%",
+          "match": {"vendor": ["Boss"], "type": ["Pedal"], "tags_none": ["no-sale"]},
+          "discount": 20,
+          "round": ".99",
+          "compare_at": "keep_existing",
+          "add_tags": ["on-sale"]
+        },
+        {"name": "everything else 10%", "discount": 10, "set_type": "Clearance", "add_tags": ["on-sale"]}
+      ]
+    }
+
+Each variant gets the first rule whose "match" it passes (no "match" = every row).
+Vendor, Type and Tags are product-level in a Shopify export (filled on the first
+row of a Handle only), so they are matched per Handle; "sku" is a regex on the
+variant's own SKU.
+
+    match       vendor / type / handle: lists of values (case-insensitive)
+                tags_any / tags_none: product has any / none of these tags
+                sku: regex searched in Variant SKU
+    discount    percent off Variant Price
+    round       "cents" (default), ".99" (down to the nearest x.99) or "none"
+    compare_at  "set" (default: old price → Compare At), "keep_existing"
+                (a filled Compare At is the original price: the discount is taken
+                from it and never raises the current price, so re-running doesn't
+                stack; an empty one is filled) or "leave"
+    set_type    new Type for matched rows
+    add_tags / remove_tags
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from shopify_export import ShopifyExport
+
+PROMO_COLS = ["Handle", "Vendor", "Type", "Tags", "Variant SKU", "Variant Price", "Variant Compare At Price"]
+RULE_KEYS = {"name", "match", "discount", "round", "compare_at", "set_type", "add_tags", "remove_tags"}
+MATCH_KEYS = {"vendor", "type", "handle", "tags_any", "tags_none", "sku"}
+ROUNDING = {"cents", ".99", "none"}
+COMPARE_AT = {"set", "keep_existing", "leave"}
+
+
+# ----------------------------- rules ---------------------------------- #
+def check_rules(rules: list) -> list:
+    """Validate rule dicts up front so a typo fails before anything is written."""
+    for i, rule in enumerate(rules, 1):
+        name = rule.get("name", f"rule {i}")
+        unknown = set(rule) - RULE_KEYS | set(rule.get("match", {})) - MATCH_KEYS
+        if unknown:
+            raise ValueError(f"{name}: unknown key(s) {sorted(unknown)}")
+        if rule.get("round", "cents") not in ROUNDING:
+            raise ValueError(f"{name}: round must be one of {sorted(ROUNDING)}")
+        if rule.get("compare_at", "set") not in COMPARE_AT:
+            raise ValueError(f"{name}: compare_at must be one of {sorted(COMPARE_AT)}")
+        if not 0 <= rule.get("discount", 0) < 100:
+            raise ValueError(f"{name}: discount must be a percentage in [0, 100)")
+        rule.setdefault("name", name)
+    return rules
+
+
+def load_rules(path) -> list:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return check_rules(data["rules"] if isinstance(data, dict) else data)
+
+
+# ----------------------------- matching ------------------------------- #
+def _tag_pattern(tags) -> str:
+    alts = "|".join(re.escape(t.strip()) for t in tags)
+    return rf"(?i)(?:^|,)\s*(?:{alts})\s*(?:,|$)"
+
+
+def product_level(df: pd.DataFrame) -> pd.DataFrame:
+    """Vendor / Type / Tags spread from each product's first row to all of its rows."""
+    cols = [c for c in ("Vendor", "Type", "Tags") if c in df.columns]
+    if "Handle" not in df.columns:
+        return df[cols]
+    return df.groupby("Handle", sort=False)[cols].transform("first")
+
+
+def rule_mask(df: pd.DataFrame, product: pd.DataFrame, match: dict) -> pd.Series:
+    mask = pd.Series(True, index=df.index)
+    for key, col in (("vendor", "Vendor"), ("type", "Type")):
+        if key in match:
+            wanted = {v.lower() for v in match[key]}
+            mask &= product[col].astype("string").str.lower().isin(wanted).fillna(False)
+    if "handle" in match:
+        mask &= df["Handle"].isin(match["handle"])
+    tags = product["Tags"].astype("string").fillna("") if "Tags" in product else pd.Series("", index=df.index)
+    if match.get("tags_any"):
+        mask &= tags.str.contains(_tag_pattern(match["tags_any"]), regex=True)
+    if match.get("tags_none"):
+        mask &= ~tags.str.contains(_tag_pattern(match["tags_none"]), regex=True)
+    if "sku" in match:
+        mask &= df["Variant SKU"].astype("string").str.contains(match["sku"], regex=True).fillna(False)
+    return mask.astype(bool)
+
+
+# ----------------------------- edits ---------------------------------- #
+def discounted(price: pd.Series, percent: float, rounding: str) -> pd.Series:
+    new = price * (1 - percent / 100)
+    if rounding == "cents":
+        return new.round(2)
+    if rounding == ".99":
+        # in whole cents, so float noise can't push an exact x.99 down a dollar
+        cents = np.round(new * 100)
+        charm = (((cents + 1) // 100) * 100 - 1) / 100    # largest x.99 not above the sale price
+        return charm.where(charm >= 0.99, new.round(2)).round(2)
+    return new
+
+
+def edit_tags(tags: pd.Series, add=(), remove=()) -> pd.Series:
+    """Add/remove tags on every cell at once (comma-separated lists, order kept, no duplicates)."""
+    items = tags.astype("string").fillna("").str.split(",").explode().str.strip()
+    items = items[items.ne("")]
+    if remove:
+        items = items[~items.str.lower().isin({t.lower() for t in remove})]
+    frames = [items.rename("tag").rename_axis("index").reset_index()]
+    for tag in add:
+        frames.append(pd.DataFrame({"index": tags.index, "tag": tag}))
+    both = pd.concat(frames, ignore_index=True)
+    both = both[~both.assign(key=both["tag"].str.lower()).duplicated(["index", "key"])]
+    joined = both.groupby("index", sort=False)["tag"].agg(",".join)
+    return joined.reindex(tags.index).fillna("")
+
+
+def apply_promotions(df: pd.DataFrame, rules: list):
+    """Apply `rules` to a copy of `df`; returns (updated frame, per-rule summary frame)."""
+    out = df.copy()
+    product = product_level(df)
+    remaining = pd.Series(True, index=df.index)
+    price = pd.to_numeric(df["Variant Price"], errors="coerce")
+    summary = []
+
+    for rule in rules:
+        hit = remaining & rule_mask(df, product, rule.get("match", {}))
+        remaining &= ~hit
+        priced = hit & price.notna()
+        if not hit.any():
+            summary.append({"rule": rule["name"], "rows": 0, "products": 0, "variants": 0,
+                            "price_before": 0.0, "price_after": 0.0})
+            continue
+
+        compare_at = rule.get("compare_at", "set")
+        if compare_at != "leave" and "Variant Compare At Price" not in out.columns:
+            out["Variant Compare At Price"] = np.nan
+        base = price
+        if compare_at == "keep_existing":
+            # an existing Compare At is the pre-sale price: discount from it, so a re-run
+            # lands on the same sale price; a row already cheaper than that keeps its price
+            original = pd.to_numeric(out["Variant Compare At Price"], errors="coerce")
+            base = original.fillna(price)
+        new_price = discounted(base[priced], rule.get("discount", 0), rule.get("round", "cents"))
+        if compare_at == "keep_existing":
+            new_price = new_price.where(new_price < price[priced], price[priced])
+        if compare_at == "set":
+            out.loc[hit, "Variant Compare At Price"] = price[hit]
+        elif compare_at == "keep_existing":
+            empty = hit & original.isna()
+            out.loc[empty, "Variant Compare At Price"] = price[empty]
+        out.loc[priced, "Variant Price"] = new_price
+        if "set_type" in rule:
+            out.loc[hit, "Type"] = rule["set_type"]
+        if rule.get("add_tags") or rule.get("remove_tags"):
+            out.loc[hit, "Tags"] = edit_tags(out.loc[hit, "Tags"], rule.get("add_tags", ()), rule.get("remove_tags", ()))
+
+        summary.append({
+            "rule": rule["name"],
+            "rows": int(hit.sum()),
+            "products": int(df.loc[hit, "Handle"].nunique()) if "Handle" in df.columns else int(hit.sum()),
+            "variants": int(priced.sum()),
+            "price_before": round(float(price[priced].sum()), 2),
+            "price_after": round(float(new_price.sum()), 2),
+        })
+    return out, pd.DataFrame(summary)
+
+
+def print_summary(summary: pd.DataFrame) -> None:
+    for r in summary.itertuples():
+        off = r.price_before - r.price_after
+        pct = 100 * off / r.price_before if r.price_before else 0
+        print(f"  {r.rule}: {r.variants} variant(s) in {r.products} product(s), "
+              f"list ${r.price_before:,.2f} → ${r.price_after:,.2f} (−{pct:.1f}%)")
+
+
+def run_sale(inp: Path, out: Path, rules: list, dry_run: bool = False) -> pd.DataFrame:
+    """Load `inp`, apply `rules`, print the summary and (unless dry_run) write `out`."""
+    export = ShopifyExport(inp, columns=PROMO_COLS)
+    df, summary = apply_promotions(export.df, check_rules(rules))
+    print(f"{'DRY RUN – ' if dry_run else ''}{inp.name}: {len(df)} row(s)")
+    print_summary(summary)
+    if not dry_run:
+        export.write(out, df)
+        print(f"✅  Updated CSV written to: {out}")
+    return summary
+
+
+# ------------------------------ main ---------------------------------- #
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply a rule-file sale/markdown to a Shopify-style CSV")
+    parser.add_argument("input", type=Path, help="Path to the CSV file to transform")
+    parser.add_argument("rules", type=Path, help="JSON rule file")
+    parser.add_argument("-o", "--output", type=Path,
+                        help="Where to write the transformed CSV (default: <input>_updated.csv next to the source)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the per-rule summary without writing anything")
+    args = parser.parse_args()
+
+    if not args.input.is_file():
+        sys.exit(f"Error: {args.input} does not exist or is not a file.")
+    out = args.output or args.input.with_name(f"{args.input.stem}_updated{args.input.suffix}")
+    run_sale(args.input, out, load_rules(args.rules), args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+shopify_export.py – load only the Shopify export columns a script needs, write the rest back untouched.
+
+A full product export has 50+ columns, most of which a price or sale script
+never looks at. ShopifyExport reads just the requested columns, with dtypes
+from SCHEMA (numbers as float, low-cardinality flags as categories, text as
+pyarrow-backed strings when pyarrow is installed), and on write streams the
+original file, replacing only the cells whose value actually changed:
+
+    export = ShopifyExport("products_export.csv", columns=["Variant SKU", "Variant Price"])
+    df = export.df
+    df["Variant Price"] = df["Variant Price"] * 0.9
+    export.write("products_export_updated.csv", df)
+
+Every other column – and every unchanged cell of a loaded column – is
+copied from the source file as it was. The byte span of each source row is
+recorded, so rows without a change are block-copied from the original file
+and only modified rows are re-serialized: when 1% of a catalog changes, the
+write runs at close to `cp` speed and the other 99% of rows are byte-identical.
+
+With snapshot=True (or CATALOG_SNAPSHOT=1 in the environment) the frame is
+loaded from the export's Parquet snapshot (catalog_snapshot.py) instead of
+re-parsing the CSV; writing still streams the CSV itself.
+"""
+
+import csv
+import io
+import os
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    TEXT = "string[pyarrow]"
+except ImportError:
+    TEXT = "string"
+
+ENCODING = "utf-8-sig"   # Shopify/Excel exports sometimes start with a BOM
+USE_SNAPSHOT = os.environ.get("CATALOG_SNAPSHOT", "") not in ("", "0")
+BLOCK = 1 << 20          # bytes per read when copying unchanged rows
+
+NUMERIC = ["Variant Price", "Variant Compare At Price", "Cost per item", "Variant Grams",
+           "Variant Inventory Qty"]
+CATEGORICAL = ["Vendor", "Published", "Status", "Gift Card", "Variant Inventory Tracker",
+               "Variant Inventory Policy", "Variant Fulfillment Service", "Variant Requires Shipping",
+               "Variant Taxable", "Variant Weight Unit"]
+
+# column -> dtype; columns not listed here are read as text
+SCHEMA = {**{c: "float64" for c in NUMERIC}, **{c: "category" for c in CATEGORICAL}}
+
+
+def read_typed(path, columns) -> pd.DataFrame:
+    """Read `columns` with SCHEMA dtypes; an unparseable number ('N/A', '$10') becomes NaN instead of failing."""
+    df = pd.read_csv(
+        path,
+        usecols=columns,
+        dtype={c: TEXT if c in NUMERIC else SCHEMA.get(c, TEXT) for c in columns},
+        encoding=ENCODING,
+    )
+    for col in df.columns.intersection(NUMERIC):
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return df
+
+
+def read_header(path) -> list:
+    with open(path, newline="", encoding=ENCODING) as f:
+        return next(csv.reader(f))
+
+
+def _cell(value) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    return str(value)
+
+
+def _copy_range(src, start: int, end: int = None):
+    """Yield the bytes of src[start:end] (to EOF if end is None) in BLOCK-sized pieces."""
+    src.seek(start)
+    left = None if end is None else end - start
+    while left is None or left > 0:
+        block = src.read(BLOCK if left is None else min(BLOCK, left))
+        if not block:
+            return
+        if left is not None:
+            left -= len(block)
+        yield block
+
+
+class ShopifyExport:
+    """One Shopify product export: a typed frame of the loaded columns plus the path to write back from."""
+
+    def __init__(self, path, columns=None, snapshot=None):
+        self.path = Path(path)
+        self.header = read_header(self.path)
+        wanted = self.header if columns is None else [c for c in self.header if c in set(columns)]
+        if USE_SNAPSHOT if snapshot is None else snapshot:
+            from catalog_snapshot import load_snapshot
+            self.df = load_snapshot(self.path, columns=wanted)
+        else:
+            self.df = read_typed(self.path, wanted)
+        self._original = self.df.copy()
+
+    def changed_cells(self, df: pd.DataFrame) -> dict:
+        """Column -> boolean mask of rows whose value differs from what was read."""
+        if len(df) != len(self._original):
+            raise ValueError(f"{self.path.name}: expected {len(self._original)} rows, got {len(df)}")
+        changed = {}
+        for col in df.columns:
+            if col not in self._original.columns:
+                changed[col] = pd.Series(True, index=df.index)
+                continue
+            old, new = self._original[col], df[col]
+            old_na, new_na = old.isna().to_numpy(), new.isna().to_numpy()
+            # compare as plain objects with missing values masked out (pd.NA has no truth value)
+            same = old.astype(object).where(~old_na, None).to_numpy() == new.astype(object).where(~new_na, None).to_numpy()
+            differs = pd.Series((old_na != new_na) | (~old_na & ~new_na & ~same.astype(bool)), index=df.index)
+            if differs.any():
+                changed[col] = differs
+        return changed
+
+    @cached_property
+    def spans(self):
+        """(body_start, row starts, row ends): byte offsets of the header end and of every data row.
+
+        Rows are split on newlines outside double quotes, so a multi-line
+        Body (HTML) cell stays one row; blank lines are skipped, as pandas does.
+        """
+        starts, ends = [], []
+        body_start, pos, row_start, in_quotes = None, 0, 0, False
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not in_quotes:
+                    row_start = pos
+                if line.count(b'"') % 2:
+                    in_quotes = not in_quotes
+                pos += len(line)
+                if in_quotes:
+                    continue
+                if body_start is None:
+                    body_start = pos
+                elif pos - row_start > len(line) or line.strip(b"\r\n"):
+                    starts.append(row_start)
+                    ends.append(pos)
+        return body_start or pos, np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+    def _patched_body(self, df: pd.DataFrame, changed: dict):
+        """Yield the data rows as bytes: unchanged runs copied verbatim, changed rows re-serialized."""
+        _, starts, ends = self.spans
+        patches = [(self.header.index(col), df[col].to_numpy(object), mask.to_numpy())
+                   for col, mask in changed.items()]
+        dirty = np.flatnonzero(np.logical_or.reduce([m for _, _, m in patches])) if patches else []
+
+        with open(self.path, "rb") as src:
+            cursor = self.spans[0]
+            for i in dirty:
+                yield from _copy_range(src, cursor, starts[i])
+                src.seek(starts[i])
+                text = src.read(ends[i] - starts[i]).decode("utf-8")
+                eol = "\r\n" if text.endswith("\r\n") else "\n" if text.endswith("\n") else ""
+                record = next(csv.reader(io.StringIO(text, newline="")))
+                record += [""] * (len(self.header) - len(record))
+                for pos, values, mask in patches:
+                    if mask[i]:
+                        record[pos] = _cell(values[i])
+                buf = io.StringIO()
+                csv.writer(buf, lineterminator=eol).writerow(record)
+                yield buf.getvalue().encode("utf-8")
+                cursor = ends[i]
+            yield from _copy_range(src, cursor)
+
+    def can_patch(self, df: pd.DataFrame, changed: dict) -> bool:
+        """True if the output keeps the source header, so unchanged rows can be copied byte-for-byte."""
+        return all(c in self.header for c in changed) and len(self.spans[1]) == len(df)
+
+    def rows(self, df: pd.DataFrame, header: list = None, changed: dict = None):
+        """Yield the source rows, laid out on `header`, with the cells changed in `df` replaced."""
+        changed = self.changed_cells(df) if changed is None else changed
+        header = header or self.header + [c for c in changed if c not in self.header]
+        src = {c: i for i, c in enumerate(self.header)}
+        layout = [src.get(c) for c in header]
+        patches = [(header.index(col), df[col].to_numpy(object), mask.to_numpy())
+                   for col, mask in changed.items() if col in header]
+
+        with open(self.path, newline="", encoding=ENCODING) as f:
+            reader = csv.reader(f)
+            next(reader)
+            n = 0
+            for record in reader:
+                if not record:          # pandas skips blank lines too, keep the row numbers aligned
+                    continue
+                row = [record[i] if i is not None and i < len(record) else "" for i in layout]
+                for pos, values, mask in patches:
+                    if mask[n]:
+                        row[pos] = _cell(values[n])
+                yield row
+                n += 1
+
+    def write(self, out_path, df: pd.DataFrame = None) -> Path:
+        """Write the export with the changes made in `df` (default: self.df)."""
+        df = self.df if df is None else df
+        changed = self.changed_cells(df)
+        if not self.can_patch(df, changed):
+            header = self.header + [c for c in changed if c not in self.header]
+            return write_rows(out_path, header, self.rows(df, header, changed))
+
+        out_path = Path(out_path)
+        with open(self.path, "rb") as src, open(out_path, "wb") as dst:
+            for block in _copy_range(src, 0, self.spans[0]):    # header, byte-for-byte
+                dst.write(block)
+            for block in self._patched_body(df, changed):
+                dst.write(block)
+        return out_path
+
+
+def write_rows(out_path, header: list, rows) -> Path:
+    out_path = Path(out_path)
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+    return out_path
+
+
+def write_combined(exports, frames, out_path) -> Path:
+    """Write several exports (with their edited frames) as one CSV on the union of their headers."""
+    changed = [export.changed_cells(df) for export, df in zip(exports, frames)]
+    header = []
+    for export, cells in zip(exports, changed):
+        for col in export.header + list(cells):
+            if col not in header:
+                header.append(col)
+    out_path = Path(out_path)
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        for export, df, cells in zip(exports, frames, changed):
+            if export.header == header and export.can_patch(df, cells):
+                last = b"\n"
+                for block in export._patched_body(df, cells):
+                    f.flush()
+                    f.buffer.write(block)
+                    last = block[-1:]
+                if last != b"\n":     # source file without a trailing newline
+                    f.buffer.write(b"\n")
+            else:
+                writer.writerows(export.rows(df, header, cells))
+    return out_path
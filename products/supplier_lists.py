@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+supplier_lists.py – parse each supplier price list once, load it from a cache afterwards.
+
+Supplier lists change a few times a year but the updaters read them dozens of
+times a week. load_price_list() parses a list with its SupplierList spec
+(string key, stripped; money columns "$1,234.50" → 1234.5, blank → NaN) and
+stores the typed frame in .price_cache/ next to the list:
+
+    prices = load_price_list("stentor_pricelist.csv", "stentor")
+
+The cache is Parquet when pyarrow is installed and a pickle otherwise. It is
+reused while the list's size and mtime are unchanged; if they change, the file
+is re-hashed and only re-parsed when its contents actually differ.
+
+Warm the cache (or inspect a list) from the command line:
+
+    python supplier_lists.py stentor stentor_pricelist.csv [--refresh]
+"""
+
+import argparse
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (only needed for the Parquet cache)
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pickle"
+
+CACHE_DIR = ".price_cache"
+CACHE_VERSION = "1"   # bump when parsing rules change so old caches are ignored
+
+
+@dataclass(frozen=True)
+class SupplierList:
+    name: str
+    key: str                 # price-list column matched against the catalog
+    money: tuple = ()        # columns holding prices, parsed to float
+
+
+SUPPLIERS = {
+    "profile":  SupplierList("profile",  "Model",    ("Dealer Price", "MAP")),
+    "stentor":  SupplierList("stentor",  "Model",    ("2025 List", "Dealer")),
+    "daddario": SupplierList("daddario", "ProdCode", ("Net Price",)),
+}
+
+
+# ----------------------------------------------------------------------
+# Parsing
+def parse_money(values: pd.Series) -> pd.Series:
+    """'$1,234.50' → 1234.5; blank or unparseable cells → NaN."""
+    cleaned = values.astype("string").str.replace(r"[$,\s]", "", regex=True)
+    return pd.to_numeric(cleaned.replace("", pd.NA), errors="coerce").astype("float64")
+
+
+def parse_price_list(path, spec: SupplierList) -> pd.DataFrame:
+    """Read a raw supplier list: every column as text, key stripped, money columns as float."""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    missing = [c for c in (spec.key, *spec.money) if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path}: missing {spec.name} column(s) {missing}")
+    df[spec.key] = df[spec.key].str.strip()
+    for col in spec.money:
+        df[col] = parse_money(df[col])
+    return df
+
+
+# ----------------------------------------------------------------------
+# Cache
+def _file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_paths(path: Path, spec: SupplierList):
+    base = path.parent / CACHE_DIR / f"{path.stem}.{spec.name}"
+    suffix = ".parquet" if CACHE_FORMAT == "parquet" else ".pkl"
+    return base.parent / (base.name + suffix), base.parent / (base.name + ".json")
+
+
+def _read_cache(data_path: Path) -> pd.DataFrame:
+    if data_path.suffix == ".parquet":
+        return pd.read_parquet(data_path)
+    return pd.read_pickle(data_path)
+
+
+def _write_cache(df: pd.DataFrame, data_path: Path) -> None:
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    if data_path.suffix == ".parquet":
+        df.to_parquet(data_path, index=False)
+    else:
+        df.to_pickle(data_path)
+
+
+def load_price_list(path, supplier, refresh: bool = False) -> pd.DataFrame:
+    """Typed price list for `supplier` (a SUPPLIERS name or a SupplierList), parsed at most once per file version."""
+    path = Path(path)
+    spec = SUPPLIERS[supplier] if isinstance(supplier, str) else supplier
+    data_path, meta_path = _cache_paths(path, spec)
+    st = path.stat()
+    stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    meta = {}
+    if meta_path.exists() and data_path.exists() and not refresh:
+        meta = json.loads(meta_path.read_text())
+        if meta.get("version") == CACHE_VERSION and meta.get("spec") == repr(spec):
+            if {k: meta.get(k) for k in stamp} == stamp:
+                return _read_cache(data_path)
+        else:
+            meta = {}
+
+    # size/mtime moved (or no cache yet): only re-parse if the bytes changed
+    digest = _file_hash(path)
+    if meta.get("sha256") == digest:
+        df = _read_cache(data_path)
+    else:
+        df = parse_price_list(path, spec)
+        _write_cache(df, data_path)
+    meta_path.write_text(json.dumps({"version": CACHE_VERSION, "spec": repr(spec), "sha256": digest,
+                                     "rows": len(df), **stamp}, indent=2))
+    return df
+
+
+# ----------------------------------------------------------------------
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Parse a supplier price list into the .price_cache/ copy used by the updaters.")
+    ap.add_argument("supplier", choices=sorted(SUPPLIERS))
+    ap.add_argument("price_list", help="Raw supplier CSV")
+    ap.add_argument("--refresh", action="store_true", help="Re-parse even if the cache is current")
+    args = ap.parse_args()
+
+    df = load_price_list(args.price_list, args.supplier, refresh=args.refresh)
+    spec = SUPPLIERS[args.supplier]
+    print(f"{args.price_list}: {len(df)} row(s), {df[spec.key].nunique()} distinct {spec.key}")
+    for col in spec.money:
+        print(f"  {col}: {df[col].notna().sum()} priced, {df[col].isna().sum()} blank")
+    print(f"Cache: {_cache_paths(Path(args.price_list), spec)[0]} ({CACHE_FORMAT})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# tests/test_catalog_snapshot.py
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from catalog_snapshot import load_snapshot
+from shopify_export import ShopifyExport
+
+# Vendor only on each product's first row; "cable" has no Vendor at all
+EXPORT = ("Handle,Title,Vendor,Variant SKU,Variant Barcode,Variant Price,Status\n"
+          "ds1,DS-1,Boss,DS1-A,00123,99.00,active\n"
+          "ds1,,,DS1-B,,109.00,\n"
+          "fg800,FG800,Yamaha,FG800,,299.99,active\n"
+          "cable,Cable,,C10,,19.99,draft\n"
+          "rc30,RC-30,Boss,RC30,,249.00,active\n")
+
+def write(path, text):
+    path.write_bytes(text.encode("utf-8"))
+    return path
+
+def test_snapshot_round_trips_the_export(tmp_path):
+    src = write(tmp_path / "products_export.csv", EXPORT)
+    pd.testing.assert_frame_equal(load_snapshot(src), ShopifyExport(src, snapshot=False).df)
+    # a second load reads the existing snapshot
+    pd.testing.assert_frame_equal(load_snapshot(src), ShopifyExport(src, snapshot=False).df)
+
+def test_vendor_and_sku_filters_keep_export_order(tmp_path):
+    src = write(tmp_path / "products_export.csv", EXPORT)
+    boss = load_snapshot(src, vendors=["Boss"], columns=["Variant Price", "Variant SKU"])
+    assert list(boss.columns) == ["Variant SKU", "Variant Price"]
+    assert boss.index.tolist() == [0, 1, 4]
+    assert boss["Variant SKU"].tolist() == ["DS1-A", "DS1-B", "RC30"]
+    by_sku = load_snapshot(src, skus=["RC30", "C10", "DS1-B"], columns=["Variant SKU"])
+    assert by_sku.index.tolist() == [1, 3, 4]
+    assert by_sku["Variant SKU"].tolist() == ["DS1-B", "C10", "RC30"]
+    assert load_snapshot(src, vendors=["Yamaha"], skus=["RC30"]).empty
+    assert load_snapshot(src, handles=["fg800"])["Variant Barcode"].isna().all()
+
+def test_snapshot_is_rebuilt_when_the_export_changes(tmp_path):
+    src = write(tmp_path / "products_export.csv", EXPORT)
+    assert load_snapshot(src, skus=["FG800"])["Variant Price"].tolist() == [299.99]
+    write(src, EXPORT.replace("299.99", "279.99") + "new,New,Fender,N1,,5.00,draft\n")
+    df = load_snapshot(src)
+    assert df.loc[2, "Variant Price"] == 279.99
+    assert load_snapshot(src, vendors=["Fender"])["Variant SKU"].tolist() == ["N1"]
+    pd.testing.assert_frame_equal(df, ShopifyExport(src, snapshot=False).df)
+
+def test_header_only_export_loads_empty(tmp_path):
+    src = write(tmp_path / "products_export.csv", EXPORT.splitlines(keepends=True)[0])
+    df = load_snapshot(src)
+    assert df.empty and list(df.columns) == EXPORT.splitlines()[0].split(",")
+    pd.testing.assert_frame_equal(df, ShopifyExport(src, snapshot=False).df)
+    assert load_snapshot(src, skus=["DS1-A"], columns=["Variant Price"])["Variant Price"].dtype == "float64"
@@ -0,0 +1,115 @@
+# tests/test_clearance.py
+
+import random
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import clearance
+
+def legacy_fix_text(text, replacement="Gently Used"):
+    # fix_text as it was before the single-pass rewrite, kept verbatim as the reference
+    if pd.isnull(text):
+        return text  # if field is NaN
+
+    # -- Step A: Replace 'previously rented' with chosen replacement
+    text = re.sub(r'(?i)previously rented', replacement, text)
+
+    # -- Step B: Replace 'used' except if preceded by 'gently' (any case/spaces)
+    pattern = re.compile(r'(?i)used')  # case-insensitive match for "used"
+
+    def replace_used(m):
+        start = m.start()
+        before_text = text[max(0, start-20):start]  # 20 chars is arbitrary padding
+        if re.search(r'(?i)gently\s*$', before_text):
+            return m.group(0)  # just return "used" as-is
+        else:
+            return replacement
+
+    text = re.sub(pattern, replace_used, text)
+
+    return text
+
+CORPUS = [
+    "",
+    "Used Yamaha FG800",
+    "USED - Boss DS-1 (previously rented)",
+    "Gently Used Fender Strat",
+    "gently used",
+    "GENTLY   USED amp",
+    "gently" + " " * 14 + "used",          # 20-char window edge: kept
+    "gently" + " " * 15 + "used",          # just outside the window: replaced
+    "gently\n\t used",
+    "ungently used",
+    "gentlyused",
+    "unused, reused, misused",
+    "used used USED",
+    "Previously Rented Previously rented",
+    "previously rentedused",
+    "gently previously rented",
+    "Gently Used used",
+    "<p>This <b>used</b> trumpet was previously rented for one term.</p>\n<p>Gently  used &amp; cleaned.</p>",
+    "<ul><li>Used</li><li>gently<br>used</li></ul>",
+    "Prévïously rented — used ✓",
+]
+
+TOKENS = ["used", "Used", "USED", "uSeD", "gently", "Gently", "GENTLY", "previously rented",
+          "Previously Rented", " ", "  ", "\n", "\t", "<p>", "</p>", "un", "re", "x", ",", "gent", "ly"]
+
+def fuzz_corpus(n=2000, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(TOKENS) for _ in range(rng.randint(1, 12))) for _ in range(n)]
+
+@pytest.mark.parametrize("replacement", ["GENTLY USED", "Gently used", "Gently Used"])
+def test_fix_text_matches_legacy(replacement):
+    for text in CORPUS + fuzz_corpus():
+        assert clearance.fix_text(text, replacement) == legacy_fix_text(text, replacement), text
+
+def test_fix_column_matches_legacy_and_keeps_blanks():
+    values = pd.Series(CORPUS + [None], dtype="string")
+    for col, replacement in clearance.REPLACEMENTS.items():
+        fixed = clearance.fix_column(values, replacement)
+        assert fixed.iloc[-1] is pd.NA
+        assert fixed.iloc[:-1].tolist() == [legacy_fix_text(t, replacement) for t in CORPUS]
+
+def test_self_rewriting_replacement_rejected():
+    with pytest.raises(ValueError):
+        clearance.fix_text("used", "Used")
+
+def test_main_combines_and_rewrites(tmp_path):
+    (tmp_path / "clearance1.csv").write_text(
+        'Handle,Title,Body (HTML),Variant SKU\n'
+        'gtr,Used Guitar,"<p>Previously rented,\nused once</p>",00123\n'
+        'gtr,,,\n')
+    (tmp_path / "clearance2.csv").write_text('Handle,Title,Body (HTML),Variant SKU\namp,Gently Used Amp,,A-1\n')
+    out = tmp_path / "combined.csv"
+    clearance.main(str(tmp_path / "clearance?.csv"), out)
+    assert out.read_text() == (
+        'Handle,Title,Body (HTML),Variant SKU\n'
+        'gtr,GENTLY USED Guitar,"<p>Gently used,\nGently used once</p>",00123\n'
+        'gtr,,,\n'
+        'amp,Gently Used Amp,,A-1\n')
+
+def test_html_aware_rewrites_text_nodes_only():
+    body = ('<p class="used-gear"><a href="https://x.com/used/sax">Used sax</a>, previously rented.</p>'
+            '<img alt="used" src="/img/used.jpg"><!-- used --><script>var used = 1;</script>'
+            '<p>Gently <b>used</b>, gently used.</p>')
+    assert clearance.fix_html(body, "Gently used") == (
+        '<p class="used-gear"><a href="https://x.com/used/sax">Gently used sax</a>, Gently used.</p>'
+        '<img alt="used" src="/img/used.jpg"><!-- used --><script>var used = 1;</script>'
+        '<p>Gently <b>used</b>, gently used.</p>')
+
+def test_html_aware_matches_plain_on_text_without_markup():
+    for text in [t for t in CORPUS + fuzz_corpus() if "<" not in t]:
+        assert clearance.fix_html(text, "Gently used") == legacy_fix_text(text, "Gently used"), text
+
+def test_html_aware_column_caches_identical_bodies():
+    clearance.fix_html.cache_clear()
+    values = pd.Series(["<p>used</p>"] * 50 + [None], dtype="string")
+    fixed = clearance.fix_column(values, "Gently used", html_aware=True)
+    assert fixed.iloc[0] == "<p>Gently used</p>" and fixed.iloc[-1] is pd.NA
+    assert clearance.fix_html.cache_info().misses == 1
@@ -0,0 +1,67 @@
+# tests/test_compare_prices.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from compare_prices import diff_catalogs, same_value, to_cents
+
+HEADER = "Handle,Title,Variant SKU,Variant Price,Cost per item\n"
+
+def export(path, rows):
+    path.write_text(HEADER + "".join(r + "\n" for r in rows))
+    return path
+
+@pytest.mark.parametrize("text, cents", [
+    ("19.9", 1990), ("19.90", 1990), ("$19.90", 1990), (" $1,019.9 ", 101990),
+    ("0.005", 1), ("", None), ("  ", None), ("N/A", "N/A"), ("NaN", "NaN"),
+])
+def test_to_cents(text, cents):
+    assert to_cents(text) == cents
+
+def test_reformatted_money_is_not_a_change(tmp_path):
+    orig = export(tmp_path / "orig.csv", ["gtr,Strat,S1,19.9,10", 'amp,Amp,A1,"$1,000.00",0'])
+    upd = export(tmp_path / "upd.csv", ["gtr,Strat v2,S1,$19.90,10.00", "amp,Amp,A1,1000,0.0"])
+    changed, added, removed = diff_catalogs(orig, upd)
+    assert (changed, added, removed) == ([], [], [])
+
+def test_duplicate_handle_sku_pairs_match_by_occurrence(tmp_path):
+    orig = export(tmp_path / "orig.csv", ["gtr,Strat,S1,10,5", "gtr,,S1,20,6", "gtr,,S1,30,7"])
+    upd = export(tmp_path / "upd.csv", ["gtr,Strat,S1,10,5", "gtr,,S1,25,6"])
+    changed, added, removed = diff_catalogs(orig, upd)
+    assert changed == [{"Handle": "gtr", "Variant SKU": "S1",
+                        "Variant Price_orig": "20", "Variant Price_upd": "25",
+                        "Cost per item_orig": "6", "Cost per item_upd": "6"}]
+    assert added == []
+    assert removed == [{"Handle": "gtr", "Variant SKU": "S1", "Variant Price": "30", "Cost per item": "7"}]
+
+def test_added_and_removed_variants_and_image_rows_skipped(tmp_path):
+    orig = export(tmp_path / "orig.csv", ["gtr,Strat,S1,10,5", "gtr,,,,", "old,Old,O1,1,1"])
+    upd = export(tmp_path / "upd.csv", ["gtr,Strat,S1,10,5", "new,New,N1,2,1", "new,,,,"])
+    changed, added, removed = diff_catalogs(orig, upd)
+    assert changed == []
+    assert added == [{"Handle": "new", "Variant SKU": "N1", "Variant Price": "2", "Cost per item": "1"}]
+    assert removed == [{"Handle": "old", "Variant SKU": "O1", "Variant Price": "1", "Cost per item": "1"}]
+
+def test_tolerance_in_dollars(tmp_path):
+    orig = export(tmp_path / "orig.csv", ["gtr,Strat,S1,10.00,5", "amp,Amp,A1,10.00,5"])
+    upd = export(tmp_path / "upd.csv", ["gtr,Strat,S1,10.01,5", "amp,Amp,A1,10.02,5"])
+    assert len(diff_catalogs(orig, upd)[0]) == 2
+    changed, _, _ = diff_catalogs(orig, upd, tolerance=0.01)
+    assert [r["Variant SKU"] for r in changed] == ["A1"]
+    assert same_value(1000, 1001, 1) and not same_value(1000, 1002, 1)
+
+def test_price_going_blank_is_a_change(tmp_path):
+    orig = export(tmp_path / "orig.csv", ["gtr,Strat,S1,10.00,5"])
+    upd = export(tmp_path / "upd.csv", ["gtr,Strat,S1,,5"])
+    changed, _, _ = diff_catalogs(orig, upd, tolerance=100)
+    assert changed[0]["Variant Price_orig"] == "10.00" and changed[0]["Variant Price_upd"] == ""
+
+def test_missing_required_column_is_reported(tmp_path):
+    orig = export(tmp_path / "orig.csv", ["gtr,Strat,S1,10,5"])
+    bad = tmp_path / "bad.csv"
+    bad.write_text("Handle,Variant SKU\ngtr,S1\n")
+    with pytest.raises(KeyError, match="UPDATED is missing"):
+        diff_catalogs(orig, bad)
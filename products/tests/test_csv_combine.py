@@ -0,0 +1,100 @@
+# tests/test_csv_combine.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import csv_combine
+from combine_csv_files import combine_csv_files
+
+def write(path, text):
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+def test_matching_files_are_copied_verbatim(tmp_path):
+    a = write(tmp_path / "a.csv", 'Handle,Title,Variant SKU\ngtr,"Strat,\nused",00123\n')
+    b = write(tmp_path / "b.csv", "Handle,Title,Variant SKU\namp,Amp,0042")       # no trailing newline
+    out = tmp_path / "out.csv"
+    report = csv_combine.combine_csv([a, b], out)
+    assert report.aligned
+    assert out.read_text() == 'Handle,Title,Variant SKU\ngtr,"Strat,\nused",00123\namp,Amp,0042\n'
+
+def test_mismatched_headers_are_aligned_on_union(tmp_path):
+    a = write(tmp_path / "a.csv", "Handle,Title,Variant SKU\ngtr,Strat,00123\n")
+    b = write(tmp_path / "b.csv", "Handle,Variant SKU,Vendor\namp,0042,Boss\n")
+    out = tmp_path / "out.csv"
+    report = csv_combine.combine_csv([a, b], out)
+    assert report.columns == ["Handle", "Title", "Variant SKU", "Vendor"]
+    assert report.missing == {a: ["Vendor"], b: ["Title"]} and report.extra == {b: ["Vendor"]}
+    assert out.read_text() == "Handle,Title,Variant SKU,Vendor\ngtr,Strat,00123,\namp,,0042,Boss\n"
+
+def test_strict_rejects_mismatched_headers(tmp_path):
+    a = write(tmp_path / "a.csv", "Handle,Title\ngtr,Strat\n")
+    b = write(tmp_path / "b.csv", "Handle,Vendor\namp,Boss\n")
+    with pytest.raises(ValueError, match="headers differ"):
+        csv_combine.combine_csv([a, b], tmp_path / "out.csv", strict=True)
+
+def test_read_kwargs_also_tokenize_the_header(tmp_path):
+    write(tmp_path / "x1.csv", "Handle;Variant SKU\ngtr;00123\n")
+    write(tmp_path / "x2.csv", "Handle;Variant SKU\namp;0042\n")
+    out = tmp_path / "out.csv"
+    combine_csv_files(str(tmp_path / "x*.csv"), str(out), sep=";")
+    assert out.read_text() == "Handle,Variant SKU\ngtr,00123\namp,0042\n"
+
+def test_output_keeps_one_line_ending(tmp_path):
+    a = write(tmp_path / "a.csv", "\ufeffHandle,Title\r\ngtr,Strat\r\n")
+    b = write(tmp_path / "b.csv", 'Handle,Title\namp,"Amp\nhead"\n')
+    c = write(tmp_path / "c.csv", "Handle,Title\r\nped,DS-1\r\n")
+    out = tmp_path / "out.csv"
+    csv_combine.combine_csv([a, b, c], out)
+    assert out.read_bytes() == b'Handle,Title\r\ngtr,Strat\r\namp,"Amp\nhead"\r\nped,DS-1\r\n'
+
+def test_files_are_taken_in_natural_order(tmp_path):
+    for n in (10, 2, 1):
+        write(tmp_path / f"products_export-{n}.csv", f"Handle\np{n}\n")
+    files = csv_combine.find_files(str(tmp_path / "products_export-*.csv"))
+    assert [Path(f).name for f in files] == ["products_export-1.csv", "products_export-2.csv", "products_export-10.csv"]
+
+OVERLAP_A = "Handle,Title,Variant SKU,Variant Price\ngtr,Strat,S1,10\ngtr,,,\ngtr,,S2,11\n"
+OVERLAP_B = "Handle,Title,Variant SKU,Variant Price\ngtr,Strat v2,S1,12\ngtr,,,\namp,Amp,A1,1.00\n"
+
+@pytest.mark.parametrize("keep, rows, kept, dropped", [
+    ("first", ["gtr,Strat,S1,10", "gtr,,,", "gtr,,S2,11", "gtr,,,", "amp,Amp,A1,1.00"], "a.csv", "b.csv"),
+    ("last", ["gtr,,,", "gtr,,S2,11", "gtr,Strat v2,S1,12", "gtr,,,", "amp,Amp,A1,1.00"], "b.csv", "a.csv"),
+])
+def test_dedupe_keeps_first_or_last_and_passes_blank_keys(tmp_path, keep, rows, kept, dropped):
+    a = write(tmp_path / "a.csv", OVERLAP_A)
+    b = write(tmp_path / "b.csv", OVERLAP_B)
+    out = tmp_path / "out.csv"
+    report = csv_combine.combine_csv([a, b], out, dedupe=csv_combine.DEDUPE_KEYS, keep=keep)
+    assert out.read_text().splitlines() == ["Handle,Title,Variant SKU,Variant Price"] + rows
+    assert report.collisions.to_dict("records") == [{
+        "Handle": "gtr", "Variant SKU": "S1",
+        "kept_file": str(tmp_path / kept), "kept_row": 1,
+        "dropped_file": str(tmp_path / dropped), "dropped_row": 1,
+    }]
+
+def test_dedupe_copies_files_without_duplicates_verbatim(tmp_path):
+    a = write(tmp_path / "a.csv", OVERLAP_A)
+    b = write(tmp_path / "b.csv", "Handle,Title,Variant SKU,Variant Price\nped,DS-1,P1,99.00\n")
+    out = tmp_path / "out.csv"
+    report = csv_combine.combine_csv([a, b], out, dedupe=csv_combine.DEDUPE_KEYS)
+    assert report.collisions.empty
+    assert out.read_text() == OVERLAP_A + "ped,DS-1,P1,99.00\n"
+
+def test_dedupe_rejects_unknown_keep(tmp_path):
+    a = write(tmp_path / "a.csv", OVERLAP_A)
+    with pytest.raises(ValueError, match="keep"):
+        csv_combine.combine_csv([a], tmp_path / "out.csv", dedupe=["Handle"], keep="newest")
+
+def test_collision_report_written_by_cli_wrapper(tmp_path):
+    write(tmp_path / "e-1.csv", OVERLAP_A)
+    write(tmp_path / "e-2.csv", OVERLAP_B)
+    report_path = tmp_path / "dupes.csv"
+    combine_csv_files(str(tmp_path / "e-*.csv"), str(tmp_path / "out.csv"),
+                      dedupe=["Variant SKU"], keep="first", collisions_file=str(report_path))
+    lines = report_path.read_text().splitlines()
+    assert lines[0] == "Variant SKU,kept_file,kept_row,dropped_file,dropped_row"
+    assert len(lines) == 2 and lines[1].startswith("S1,")
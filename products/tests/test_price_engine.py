@@ -0,0 +1,95 @@
+# tests/test_price_engine.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from price_engine import PriceSource, _differs, apply_price_updates, diff_import, write_import_files
+from update_stentor_products import STENTOR_SOURCE
+
+COST = PriceSource(key="Variant SKU", source_key="Model", fields={"Cost per item": "Dealer"})
+
+def catalog(**cols):
+    return pd.DataFrame({"Variant SKU": ["A", "B", "C"], **cols})
+
+def test_duplicate_price_list_keys_resolve_first_wins():
+    prices = pd.DataFrame({"Model": ["A", "A"], "Dealer": [5.0, 9.0]})
+    result = apply_price_updates(catalog(**{"Cost per item": [1.0, 2.0, 3.0]}), prices, COST)
+    assert result.catalog["Cost per item"].tolist() == [5.0, 2.0, 3.0]
+
+def test_blank_keys_never_match():
+    cat = pd.DataFrame({"Variant SKU": ["A", "", None], "Cost per item": [1.0, 2.0, 3.0]})
+    prices = pd.DataFrame({"Model": ["", "  ", None], "Dealer": [7.0, 8.0, 9.0]})
+    result = apply_price_updates(cat, prices, COST)
+    assert not result.applied.any()
+    assert result.catalog["Cost per item"].tolist() == [1.0, 2.0, 3.0]
+
+def test_missing_values_compare_equal():
+    old = pd.Series([np.nan, pd.NA, None, 1.0, np.nan, 2.0], dtype=object)
+    new = pd.Series([None, np.nan, pd.NA, np.nan, 1.0, 2.0], dtype=object)
+    assert _differs(old, new).tolist() == [False, False, False, True, True, False]
+
+def test_missing_price_list_value_never_overwrites():
+    prices = pd.DataFrame({"Model": ["A", "B"], "Dealer": [np.nan, 4.0]})
+    cat = catalog(**{"Cost per item": [np.nan, np.nan, 3.0]})
+    result = apply_price_updates(cat, prices, PriceSource(**{**COST.__dict__, "skip_blank": False}))
+    assert result.applied.tolist() == [False, True, False]
+    assert result.changes[["key", "field", "new"]].to_dict("records") == [
+        {"key": "B", "field": "Cost per item", "new": 4.0}]
+
+def test_same_value_applied_is_not_changed():
+    prices = pd.DataFrame({"Model": ["A"], "Dealer": [1.0]})
+    result = apply_price_updates(catalog(**{"Cost per item": [1.0, 2.0, 3.0]}), prices, COST)
+    assert result.applied.tolist() == [True, False, False]
+    assert not result.changed.any() and result.changes.empty
+
+def test_stentor_fields_are_skipped_independently():
+    # blank List keeps the price but Dealer still updates the cost, and vice versa
+    prices = pd.DataFrame({"Model": ["A", "B"], "2025 List": [np.nan, 30.0], "Dealer": [6.0, ""]})
+    cat = catalog(**{"Variant Price": [10.0, 20.0, 30.0], "Cost per item": [5.0, 15.0, 25.0]})
+    result = apply_price_updates(cat, prices, STENTOR_SOURCE)
+    assert result.catalog["Variant Price"].tolist() == [10.0, 30.0, 30.0]
+    assert result.catalog["Cost per item"].tolist() == [6.0, 15.0, 25.0]
+    assert result.fields_applied["Variant Price"].tolist() == [False, True, False]
+    assert result.fields_applied["Cost per item"].tolist() == [True, False, False]
+
+def test_skip_zero_keeps_current_value():
+    prices = pd.DataFrame({"Model": ["A", "B"], "Dealer": [0.0, 8.0]})
+    result = apply_price_updates(catalog(**{"Cost per item": [1.0, 2.0, 3.0]}), prices,
+                                 PriceSource(**{**COST.__dict__, "skip_zero": True}))
+    assert result.catalog["Cost per item"].tolist() == [1.0, 8.0, 3.0]
+
+def test_locked_cells_are_left_alone():
+    prices = pd.DataFrame({"Model": ["A", "B", "C"], "Dealer": [7.0, 8.0, 9.0]})
+    cat = catalog(**{"Cost per item": [1.0, 2.0, 3.0]})
+    locked = {"Cost per item": pd.Series([False, True, False]), "Variant Price": pd.Series([True] * 3)}
+    result = apply_price_updates(cat, prices, COST, locked)
+    assert result.catalog["Cost per item"].tolist() == [7.0, 2.0, 9.0]
+    assert result.changes["key"].tolist() == ["A", "C"]
+    assert cat["Cost per item"].tolist() == [1.0, 2.0, 3.0]      # input untouched
+
+def test_missing_catalog_column_is_created():
+    prices = pd.DataFrame({"Model": ["C"], "Dealer": [9.0]})
+    result = apply_price_updates(catalog(), prices, COST)
+    assert result.catalog["Cost per item"].isna().tolist() == [True, True, False]
+    assert result.changes["old"].isna().all()
+
+def test_diff_import_compares_prices_as_numbers():
+    before = pd.DataFrame({"Handle": ["a", "b", "c"], "Variant SKU": ["A", "B", "C"],
+                           "Variant Price": ["20.00", "5", ""], "Cost per item": ["1.0", "2", "3"]})
+    after = before.assign(**{"Variant Price": [20.0, 5.5, np.nan], "Cost per item": [1.0, 2.0, 3.0]})
+    diff = diff_import(before, after, ["Variant Price", "Cost per item"])
+    assert diff.to_dict("records") == [{"Handle": "b", "Variant SKU": "B", "Variant Price": 5.5}]
+
+def test_import_files_never_split_a_handle(tmp_path):
+    df = pd.DataFrame({"Handle": ["a", "a", "b", None, "b", "c", "c", "c", None],
+                       "Variant SKU": [f"S{i}" for i in range(9)]})
+    paths = write_import_files(df, tmp_path / "import.csv", max_rows=3)
+    parts = [pd.read_csv(p, keep_default_na=False) for p in paths]
+    assert [p.name for p in paths] == [f"import_part{i:03d}.csv" for i in range(1, len(paths) + 1)]
+    assert sorted(sum((p["Variant SKU"].tolist() for p in parts), [])) == df["Variant SKU"].tolist()
+    for handle in ("a", "b", "c", ""):
+        assert sum(handle in p["Handle"].tolist() for p in parts) == 1
@@ -0,0 +1,27 @@
+# tests/test_price_ledger.py
+
+import functools
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import price_ledger
+import update_shopify_prices
+from price_ledger import PriceLedger, record_update
+
+def test_default_ledger_lives_in_products():
+    if "PRICE_LEDGER" not in os.environ:
+        assert Path(price_ledger.DEFAULT_LEDGER) == Path(__file__).resolve().parents[1] / "price_ledger.sqlite"
+
+def test_standalone_shopify_update_is_recorded_as_shopify(tmp_path, monkeypatch):
+    ledger = tmp_path / "ledger.sqlite"
+    monkeypatch.setattr(update_shopify_prices, "record_update", functools.partial(record_update, path=ledger))
+    (tmp_path / "products.csv").write_text("Handle,Variant SKU,Variant Price,Cost per item\ngtr,S1,20.00,10.00\n")
+    (tmp_path / "prices.csv").write_text("Variant SKU,Variant Price\nS1,22.00\n")
+    update_shopify_prices.update_shopify_prices(tmp_path / "products.csv", tmp_path / "prices.csv",
+                                                tmp_path / "out.csv")
+    with PriceLedger(ledger) as db:
+        changes = db.changes(source="shopify")
+    assert changes[["SKU", "Handle", "Field", "Old", "New"]].values.tolist() == [
+        ["S1", "gtr", "Variant Price", 20.0, 22.0]]
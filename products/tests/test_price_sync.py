@@ -0,0 +1,55 @@
+# tests/test_price_sync.py
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from price_engine import PriceSource, apply_price_updates
+from price_sync import sync_prices
+
+LIST_A = PriceSource(key="Variant SKU", source_key="Model", fields={"Variant Price": "List", "Cost per item": "Dealer"})
+LIST_B = PriceSource(key="Variant SKU", source_key="SKU", fields={"Variant Price": "Price"})
+
+def catalog():
+    # prices as the export's text, so "10.00" vs 10.0 must not count as a change
+    return pd.DataFrame({"Variant SKU": ["S1", "S2", "S3"],
+                         "Variant Price": ["10.00", "20.00", "30.00"], "Cost per item": ["5.00", "6.00", "7.00"]})
+
+def sources():
+    a = pd.DataFrame({"Model": ["S1", "S2"], "List": [11.0, 21.0], "Dealer": [5.0, 6.5]})
+    b = pd.DataFrame({"SKU": ["S1", "S3"], "Price": [12.0, 30.0]})
+    return [("a", a, LIST_A), ("b", b, LIST_B)]
+
+def changes(result):
+    return result.changes[["key", "field", "old", "new"]].to_dict("records")
+
+def test_first_keeps_the_earlier_source():
+    out, results = sync_prices(catalog(), sources(), "first")
+    assert out["Variant Price"].tolist() == [11.0, 21.0, 30.0]
+    assert out["Cost per item"].tolist() == [5.0, 6.5, 7.0]
+    assert changes(results["a"]) == [
+        {"key": "S1", "field": "Variant Price", "old": 10.0, "new": 11.0},
+        {"key": "S2", "field": "Variant Price", "old": 20.0, "new": 21.0},
+        {"key": "S2", "field": "Cost per item", "old": 6.0, "new": 6.5}]
+    # b's S1 price is locked by a and its S3 price equals the catalog's
+    assert changes(results["b"]) == []
+    assert results["b"].fields_applied["Variant Price"].tolist() == [False, False, True]
+
+def test_last_equals_running_the_sources_one_after_another():
+    out, results = sync_prices(catalog(), sources(), "last")
+    one_by_one = catalog()
+    for col in ("Variant Price", "Cost per item"):
+        one_by_one[col] = pd.to_numeric(one_by_one[col])
+    for _, prices, source in sources():
+        one_by_one = apply_price_updates(one_by_one, prices, source).catalog
+    pd.testing.assert_frame_equal(out, one_by_one)
+    assert out["Variant Price"].tolist() == [12.0, 21.0, 30.0]
+    assert len(results["a"].changes) == 3
+    assert changes(results["b"]) == [{"key": "S1", "field": "Variant Price", "old": 11.0, "new": 12.0}]
+
+def test_unknown_precedence_is_rejected():
+    with pytest.raises(ValueError, match="precedence"):
+        sync_prices(catalog(), sources(), "newest")
@@ -0,0 +1,85 @@
+# tests/test_promotions.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from promotions import apply_promotions, check_rules, discounted, edit_tags
+
+def catalog():
+    # Vendor / Type / Tags only on each product's first row, as in a Shopify export
+    return pd.DataFrame({
+        "Handle": ["ds1", "ds1", "fg800", "strat"],
+        "Vendor": ["Boss", None, "Yamaha", "Fender"],
+        "Type": ["Pedal", None, "Guitar", "Guitar"],
+        "Tags": ["used, Pedal", None, "no-sale", "new"],
+        "Variant SKU": ["DS1-A", "DS1-B", "FG800", "STRAT"],
+        "Variant Price": [100.0, 120.0, 300.0, 1000.0],
+        "Variant Compare At Price": [np.nan, 150.0, np.nan, np.nan],
+    })
+
+def test_first_matching_rule_wins_per_product():
+    rules = check_rules([
+        {"name": "boss", "match": {"vendor": ["boss"]}, "discount": 20},
+        {"name": "skip", "match": {"tags_any": ["no-sale"]}, "discount": 0, "compare_at": "leave"},
+        {"name": "rest", "discount": 10},
+    ])
+    out, summary = apply_promotions(catalog(), rules)
+    # the variant row without a Vendor still matches through its Handle
+    assert out["Variant Price"].tolist() == [80.0, 96.0, 300.0, 900.0]
+    assert summary.set_index("rule")["variants"].to_dict() == {"boss": 2, "skip": 1, "rest": 1}
+    assert summary.set_index("rule")["products"].to_dict() == {"boss": 1, "skip": 1, "rest": 1}
+
+def test_keep_existing_compare_at_does_not_stack_on_rerun():
+    rules = check_rules([{"name": "sale", "discount": 10, "compare_at": "keep_existing"}])
+    once, _ = apply_promotions(catalog(), rules)
+    twice, _ = apply_promotions(once, rules)
+    assert once["Variant Compare At Price"].tolist() == [100.0, 150.0, 300.0, 1000.0]
+    # DS1-B is already marked down from 150 to 120, deeper than 10% off 150: left alone
+    assert once["Variant Price"].tolist() == [90.0, 120.0, 270.0, 900.0]
+    assert twice["Variant Compare At Price"].tolist() == once["Variant Compare At Price"].tolist()
+    assert twice["Variant Price"].tolist() == once["Variant Price"].tolist()
+
+def test_compare_at_set_and_leave():
+    set_out, _ = apply_promotions(catalog(), check_rules([{"discount": 10}]))
+    assert set_out["Variant Compare At Price"].tolist() == [100.0, 120.0, 300.0, 1000.0]
+    leave_out, _ = apply_promotions(catalog(), check_rules([{"discount": 10, "compare_at": "leave"}]))
+    assert leave_out["Variant Compare At Price"].equals(catalog()["Variant Compare At Price"])
+
+def test_add_and_remove_tags():
+    tags = pd.Series(["used, Pedal", None, "On-Sale,new", ""])
+    assert edit_tags(tags, add=["on-sale"], remove=["USED"]).tolist() == [
+        "Pedal,on-sale", "on-sale", "On-Sale,new", "on-sale"]
+    assert edit_tags(tags, remove=["pedal", "new"]).tolist() == ["used", "", "On-Sale", ""]
+
+def test_tags_are_edited_on_matched_products_only():
+    rules = check_rules([{"match": {"type": ["guitar"], "tags_none": ["no-sale"]}, "discount": 10,
+                          "add_tags": ["on-sale"], "remove_tags": ["new"], "set_type": "Clearance"}])
+    out, _ = apply_promotions(catalog(), rules)
+    assert out["Tags"].tolist()[2:] == ["no-sale", "on-sale"]
+    assert out["Type"].tolist()[2:] == ["Guitar", "Clearance"]
+
+@pytest.mark.parametrize("price, percent, expected", [
+    (100.0, 10, 89.99),     # 90.00 → the x.99 below it
+    (99.99, 0, 99.99),      # already a .99 price stays
+    (10.0, 0.05, 9.99),     # 9.995 → 9.99
+    (1.0, 10, 0.9),         # nothing ≥ 0.99 below 0.90: keep the cents price
+    (1.1, 0, 0.99),
+    (49.40, 15, 41.99),     # 41.99 exactly, not floored to 40.99 by float noise
+    (5.70, 30, 3.99),
+    (65.32, 25, 48.99),
+])
+def test_99_rounding_boundaries(price, percent, expected):
+    assert discounted(pd.Series([price]), percent, ".99").tolist() == [expected]
+
+def test_invalid_rules_fail_up_front():
+    with pytest.raises(ValueError, match="unknown key"):
+        check_rules([{"discount": 10, "match": {"colour": ["red"]}}])
+    with pytest.raises(ValueError, match="round"):
+        check_rules([{"discount": 10, "round": "nickel"}])
+    with pytest.raises(ValueError, match="discount"):
+        check_rules([{"discount": 100}])
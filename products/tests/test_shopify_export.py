@@ -0,0 +1,89 @@
+# tests/test_shopify_export.py
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shopify_export import ShopifyExport, write_combined
+
+def write(path, text):
+    path.write_bytes(text.encode("utf-8"))
+    return path
+
+def test_unparseable_numbers_load_as_nan_and_are_written_back_untouched(tmp_path):
+    src = write(tmp_path / "in.csv", "Handle,Variant SKU,Variant Price,Cost per item\n"
+                                     "a,S1,abc,5\nb,S2,N/A,$10\nc,S3,20.00,\n")
+    export = ShopifyExport(src, columns=["Variant Price", "Cost per item"])
+    df = export.df
+    assert df["Variant Price"].dtype == "float64"
+    assert df["Variant Price"].isna().tolist() == [True, True, False]
+    assert df["Cost per item"].tolist()[0] == 5.0 and pd.isna(df["Cost per item"][1])
+    df.loc[2, "Variant Price"] = 18
+    out = export.write(tmp_path / "out.csv", df)
+    assert out.read_text() == ("Handle,Variant SKU,Variant Price,Cost per item\n"
+                               "a,S1,abc,5\nb,S2,N/A,$10\nc,S3,18.0,\n")
+
+# Body cell spans lines, barcode has a leading zero, prices carry trailing zeros, one blank line
+EXPORT = ('Handle,Title,Body (HTML),Variant SKU,Variant Barcode,Variant Price,Cost per item\n'
+          'gtr,Strat,"<p>Used,\nplayed once</p>",S1,00123,199.00,120.00\n'
+          'gtr,,,S2,,249.50,150\n'
+          '\n'
+          'amp,Amp,"<p>""Tube""</p>",A1,0042,1000.00,600.00\n')
+
+def raw_rows(data: bytes, eol: bytes):
+    return data.split(eol)
+
+def edit_price(src, tmp_path, row, price, columns=("Variant SKU", "Variant Price")):
+    export = ShopifyExport(src, columns=list(columns))
+    df = export.df
+    df.loc[row, "Variant Price"] = price
+    return export, export.write(tmp_path / "out.csv", df)
+
+def test_unchanged_export_is_byte_identical(tmp_path):
+    src = write(tmp_path / "in.csv", EXPORT)
+    export = ShopifyExport(src, columns=["Variant Price"])
+    out = export.write(tmp_path / "out.csv")
+    assert out.read_bytes() == src.read_bytes()
+
+def test_only_the_changed_row_is_reserialized(tmp_path):
+    src = write(tmp_path / "in.csv", EXPORT)
+    export, out = edit_price(src, tmp_path, 1, 229.0)
+    assert export.can_patch(export.df, export.changed_cells(export.df))
+    assert out.read_text() == EXPORT.replace("gtr,,,S2,,249.50,150\n", "gtr,,,S2,,229.0,150\n")
+
+def test_crlf_bom_and_missing_trailing_newline_are_kept(tmp_path):
+    text = "\ufeff" + EXPORT.replace("\n", "\r\n").rstrip("\r\n")
+    src = write(tmp_path / "in.csv", text)
+    _, out = edit_price(src, tmp_path, 2, 999.0)
+    expected = text.replace("A1,0042,1000.00,600.00", "A1,0042,999.0,600.00")
+    assert out.read_bytes() == expected.encode("utf-8")
+    assert raw_rows(out.read_bytes(), b"\r\n")[:2] == raw_rows(src.read_bytes(), b"\r\n")[:2]
+
+def test_change_inside_multiline_row_keeps_its_body(tmp_path):
+    src = write(tmp_path / "in.csv", EXPORT)
+    _, out = edit_price(src, tmp_path, 0, 189.0)
+    assert out.read_text() == EXPORT.replace("S1,00123,199.00,120.00", "S1,00123,189.0,120.00")
+
+def test_new_column_falls_back_to_row_writer(tmp_path):
+    src = write(tmp_path / "in.csv", EXPORT)
+    export = ShopifyExport(src, columns=["Variant Price"])
+    df = export.df.copy()
+    df["Variant Compare At Price"] = df["Variant Price"].where(df.index == 0)
+    assert not export.can_patch(df, export.changed_cells(df))
+    out = export.write(tmp_path / "out.csv", df)
+    assert out.read_text() == (
+        'Handle,Title,Body (HTML),Variant SKU,Variant Barcode,Variant Price,Cost per item,Variant Compare At Price\n'
+        'gtr,Strat,"<p>Used,\nplayed once</p>",S1,00123,199.00,120.00,199.0\n'
+        'gtr,,,S2,,249.50,150,\n'
+        'amp,Amp,"<p>""Tube""</p>",A1,0042,1000.00,600.00,\n')
+
+def test_write_combined_patches_matching_exports(tmp_path):
+    a = write(tmp_path / "a.csv", EXPORT)
+    b = write(tmp_path / "b.csv", EXPORT.replace("gtr", "bass").rstrip("\n"))
+    exports = [ShopifyExport(p, columns=["Variant Price"]) for p in (a, b)]
+    exports[1].df.loc[2, "Variant Price"] = 900.0
+    out = write_combined(exports, [e.df for e in exports], tmp_path / "out.csv")
+    body_b = EXPORT.replace("gtr", "bass").split("\n", 1)[1].replace("1000.00", "900.0")
+    assert out.read_text() == EXPORT + body_b
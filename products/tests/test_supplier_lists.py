@@ -0,0 +1,59 @@
+# tests/test_supplier_lists.py
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import supplier_lists
+
+STENTOR = "Model,Description,2025 List,Dealer\n S1 ,Strings,\"$1,234.50\",$600\nS2,Picks,,  \n"
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    real = supplier_lists.parse_price_list
+    def counting(path, spec):
+        calls.append(path)
+        return real(path, spec)
+    monkeypatch.setattr(supplier_lists, "parse_price_list", counting)
+    return calls
+
+def write(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+def test_money_and_keys_are_parsed(tmp_path):
+    df = supplier_lists.load_price_list(write(tmp_path / "stentor.csv", STENTOR, 10**18), "stentor")
+    assert df["Model"].tolist() == ["S1", "S2"]
+    assert df["2025 List"].tolist()[0] == 1234.5 and np.isnan(df["2025 List"].tolist()[1])
+    assert df["Dealer"].tolist()[0] == 600.0 and np.isnan(df["Dealer"].tolist()[1])
+    assert df["Description"].tolist() == ["Strings", "Picks"]
+
+def test_touched_but_identical_list_is_not_reparsed(tmp_path, parses):
+    path = write(tmp_path / "stentor.csv", STENTOR, 10**18)
+    first = supplier_lists.load_price_list(path, "stentor")
+    supplier_lists.load_price_list(path, "stentor")
+    write(path, STENTOR, 2 * 10**18)                 # same bytes, new mtime
+    touched = supplier_lists.load_price_list(path, "stentor")
+    assert len(parses) == 1
+    pd.testing.assert_frame_equal(touched, first)
+
+def test_changed_contents_are_reparsed(tmp_path, parses):
+    path = write(tmp_path / "stentor.csv", STENTOR, 10**18)
+    supplier_lists.load_price_list(path, "stentor")
+    write(path, STENTOR.replace("$600", "$700"), 2 * 10**18)    # same size, new bytes
+    df = supplier_lists.load_price_list(path, "stentor")
+    assert len(parses) == 2 and df["Dealer"].tolist()[0] == 700.0
+    supplier_lists.load_price_list(path, "stentor", refresh=True)
+    assert len(parses) == 3
+
+def test_missing_money_column_is_reported(tmp_path):
+    path = write(tmp_path / "daddario.csv", "ProdCode,Price\nEJ16,5\n", 10**18)
+    with pytest.raises(ValueError, match="Net Price"):
+        supplier_lists.load_price_list(path, "daddario")
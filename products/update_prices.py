@@ -8,74 +8,56 @@ Update prices in profile_products_combined.csv from profile_price_list.csv.
 Matching key:
     product_df['Variant SKU']  ==  price_df['Model']
 
-The script leaves 'Variant SKU' and 'Variant Barcode' untouched (dtype string),
-prints a summary of how many rows were updated, and saves the result to
-profile_products_combined_updated.csv.
+The script leaves 'Variant SKU' and 'Variant Barcode' untouched (only the
+rows whose price/cost changed are rewritten; every other row is copied
+byte-for-byte), prints a summary of how many rows were updated, and saves the
+result to profile_products_combined_updated.csv.
 """
 
-import pandas as pd
 from pathlib import Path
 
+from price_engine import PriceSource, apply_price_updates
+from price_ledger import record_update
+from shopify_export import ShopifyExport
+from supplier_lists import load_price_list
+
 # ----------------------------------------------------------------------
 # Configuration – edit filenames here if yours differ
 PRODUCT_FILE = "profile_products_combined.csv"
 PRICE_FILE   = "profile_price_list.csv"
 OUTPUT_FILE  = "profile_products_combined_updated.csv"
+
+PROFILE_SOURCE = PriceSource(
+    key="Variant SKU",
+    source_key="Model",
+    fields={"Cost per item": "Dealer Price", "Variant Price": "MAP"},
+    skip_blank=True,          # blank Dealer Price / MAP keeps the current value
+    name="profile",
+)
 # ----------------------------------------------------------------------
 
 def main() -> None:
     cwd = Path.cwd()
 
     # --- 1) Load both CSVs ---------------------------------------------------
-    df_prod = pd.read_csv(
+    #     (only the key and price columns; the rest is copied verbatim on save)
+    catalog = ShopifyExport(
         cwd / PRODUCT_FILE,
-        dtype={          # preserves formatting in these ID columns
-            "Variant SKU": "string",
-            "Variant Barcode": "string",
-        },
-        keep_default_na=False   # keep empty cells truly empty
+        columns=["Handle", "Variant SKU", "Variant Price", "Cost per item"],
     )
+    df_prod = catalog.df
 
-    df_price = pd.read_csv(
-        cwd / PRICE_FILE,
-        dtype={"Model": "string"},   # ensure key column is string, too
-        keep_default_na=False
-    )
-
-    # --- 2) Build a quick lookup from SKU -> (Dealer Price, MAP) ------------
-    price_lookup = (
-        df_price
-        .set_index("Model")[["Dealer Price", "MAP"]]
-        .to_dict(orient="index")
-    )
-
-    # --- 3) Iterate once, apply updates, keep track --------------------------
-    updated_skus = []
-
-    def apply_updates(row):
-        sku = row["Variant SKU"]
-        if sku in price_lookup:
-            dealer_price = price_lookup[sku]["Dealer Price"]
-            map_price    = price_lookup[sku]["MAP"]
-
-            changed = False
-            # Update Cost per item
-            if dealer_price != "":
-                row["Cost per item"] = dealer_price
-                changed = True
-            # Update Variant Price if MAP present
-            if map_price != "":
-                row["Variant Price"] = map_price
-                changed = True
-
-            if changed:
-                updated_skus.append(sku)
-        return row
+    # parsed once per price-list version, then loaded from .price_cache/
+    df_price = load_price_list(cwd / PRICE_FILE, "profile")
 
-    df_prod = df_prod.apply(apply_updates, axis=1)
+    # --- 2-3) Match on SKU and apply Dealer Price / MAP in one vectorized pass
+    result = apply_price_updates(df_prod, df_price, PROFILE_SOURCE)
+    df_prod = result.catalog
+    updated_skus = df_prod.loc[result.applied, "Variant SKU"].tolist()
+    logged = record_update(result, PROFILE_SOURCE.name)
 
     # --- 4) Save the updated dataframe --------------------------------------
-    df_prod.to_csv(cwd / OUTPUT_FILE, index=False)
+    catalog.write(cwd / OUTPUT_FILE, df_prod)
 
     # --- 5) Report -----------------------------------------------------------
     print(f"Finished.\nUpdated {len(updated_skus)} product(s).")
@@ -83,6 +65,7 @@ def main() -> None:
         print("SKUs updated:")
         for sku in updated_skus:
             print(" •", sku)
+    print(f"{logged} price change(s) added to the price ledger.")
     print(f"Result written to {OUTPUT_FILE}")
 
 # ----------------------------------------------------------------------
@@ -1,12 +1,41 @@
 # update_shopify_prices.py
 
 import pandas as pd
-import numpy as np
+
+from price_engine import IMPORT_KEYS, PriceSource, apply_price_updates, diff_import, write_import_files
+from price_ledger import record_update
+from shopify_export import ShopifyExport
+
+# Columns we will treat as numeric for comparison
+NUMERIC_COLS = ["Variant Price", "Cost per item"]
+
+def read_price_file(prices_file):
+    """A prices file keyed by 'Variant SKU' (strings), with the NUMERIC_COLS present converted to float."""
+    df_prices = pd.read_csv(prices_file, dtype=str)
+    if "Variant SKU" not in df_prices.columns:
+        df_prices["Variant SKU"] = ""
+    for col in NUMERIC_COLS:
+        if col in df_prices.columns:
+            df_prices[col] = pd.to_numeric(df_prices[col], errors="coerce")
+    return df_prices
+
+def price_file_source(df_prices, name="shopify"):
+    """Only non-null, non-zero values from the prices file overwrite the catalog."""
+    return PriceSource(
+        key="Variant SKU",
+        source_key="Variant SKU",
+        fields={col: col for col in NUMERIC_COLS if col in df_prices.columns},
+        skip_blank=True,
+        skip_zero=True,
+        name=name,
+    )
 
 def update_shopify_prices(
     products_file="yamaha_products3.csv",
     prices_file="yamaha_products3_output.csv",
-    output_file="yamaha_products3_updated.csv"
+    output_file="yamaha_products3_updated.csv",
+    diff_only=False,
+    max_rows=None,
 ):
     """
     Loads two CSV files: 
@@ -16,102 +45,57 @@ def update_shopify_prices(
     in the Shopify file based on the corresponding non-null, non-zero values 
     from the prices file. Writes the result to 'output_file'.
 
-    This version ensures that 'Variant SKU' and 'Variant Barcode' columns 
-    remain as strings (so no leading zeros or formatting changes occur),
-    and it also tracks the rows that have been modified:
+    Only the key and price columns are loaded; every other column (and every
+    unchanged cell) is copied to 'output_file' exactly as it was, so
+    'Variant SKU' and 'Variant Barcode' keep their leading zeros and formatting.
+    It also tracks the rows that have been modified:
       - The number of modified rows
       - The specific SKUs of modified rows
+
+    With diff_only=True only the modified rows are written, with just the
+    Handle/option/SKU key columns and the price fields that changed, and
+    max_rows splits that import into <output>_partNNN.csv files.
     """
     
     # Columns we want to preserve as strings (to avoid losing leading zeros etc.)
     preserve_as_str_cols = ["Variant SKU", "Variant Barcode"]
     
-    # Step 1: Read the products CSV and the prices CSV, forcing columns to be strings
-    df_products = pd.read_csv(products_file, dtype=str)
-    df_prices = pd.read_csv(prices_file, dtype=str)
+    # Step 1: Read just the key/price columns of the products CSV (prices as float,
+    # IDs as strings) and the prices CSV
+    export = ShopifyExport(products_file, columns=IMPORT_KEYS + preserve_as_str_cols + NUMERIC_COLS)
+    df_products = export.df
+    df_prices = read_price_file(prices_file)
     
     # Ensure 'Variant SKU'/'Variant Barcode' columns exist, even if empty
     for col in preserve_as_str_cols:
         if col not in df_products.columns:
             df_products[col] = ""
-        if col not in df_prices.columns:
-            df_prices[col] = ""
-    
-    # Columns we will treat as numeric for comparison
-    numeric_cols = ["Variant Price", "Cost per item"]
-    
-    # Convert numeric columns in both DataFrames to float for comparison
-    for col in numeric_cols:
-        if col in df_products.columns:
-            df_products[col] = pd.to_numeric(df_products[col], errors="coerce")
-        if col in df_prices.columns:
-            df_prices[col] = pd.to_numeric(df_prices[col], errors="coerce")
     
-    # Step 2: Merge DataFrames on 'Variant SKU' (left join to keep all product rows)
-    # suffixes=("", "_new") so df_prices columns appear as e.g., 'Variant Price_new'
-    merge_cols = ["Variant SKU"] + numeric_cols
-    df_merged = df_products.merge(
-        df_prices[merge_cols], 
-        on="Variant SKU",
-        how="left",
-        suffixes=("", "_new")
-    )
-    
-    # Before updating, let's keep track of the old values for comparison
-    df_merged["Old_Variant_Price"] = df_merged["Variant Price"]
-    df_merged["Old_Cost_per_Item"] = df_merged["Cost per item"]
-    
-    # Step 3: Update numeric columns
+    # Step 2-5: Match on 'Variant SKU' and update numeric columns in one vectorized pass.
     # We only update if:
     #  - The new value is not NaN
     #  - The new value is not zero
-    #  - The old value is different from the new value
-    
-    if "Variant Price_new" in df_merged.columns:
-        df_merged["Variant Price"] = np.where(
-            (df_merged["Variant Price_new"].notna()) &
-            (df_merged["Variant Price_new"] != 0) &
-            (df_merged["Variant Price"] != df_merged["Variant Price_new"]),
-            df_merged["Variant Price_new"],
-            df_merged["Variant Price"]
-        )
-        
-    if "Cost per item_new" in df_merged.columns:
-        df_merged["Cost per item"] = np.where(
-            (df_merged["Cost per item_new"].notna()) &
-            (df_merged["Cost per item_new"] != 0) &
-            (df_merged["Cost per item"] != df_merged["Cost per item_new"]),
-            df_merged["Cost per item_new"],
-            df_merged["Cost per item"]
-        )
-    
-    # Step 4: Identify which rows actually changed in "Variant Price" or "Cost per item"
-    # We'll compare the new values with the old values
-    price_changed = df_merged["Variant Price"] != df_merged["Old_Variant_Price"]
-    cost_changed  = df_merged["Cost per item"] != df_merged["Old_Cost_per_Item"]
-    
-    # A row is considered changed if either price_changed or cost_changed is True
-    changed_rows = price_changed | cost_changed
-    
+    # and a row counts as modified only if a value actually differs from the old one.
+    source = price_file_source(df_prices)   # ledger source "shopify", as in price_sync.py
+    result = apply_price_updates(df_products, df_prices, source)
+    df_merged = result.catalog
+
     # Collect the SKUs of changed rows
-    updated_skus = df_merged.loc[changed_rows, "Variant SKU"].tolist()
-    
+    updated_skus = df_merged.loc[result.changed, "Variant SKU"].tolist()
+
+    # Append every changed cell to the price ledger
+    record_update(result, source.name)
+
     # Count how many unique rows were updated
     num_rows_modified = len(updated_skus)
     
-    # Step 5: Cleanup temporary columns
-    # Drop the columns we no longer need: _new columns and Old_* columns
-    cols_to_drop = []
-    if "Variant Price_new" in df_merged.columns:
-        cols_to_drop.append("Variant Price_new")
-    if "Cost per item_new" in df_merged.columns:
-        cols_to_drop.append("Cost per item_new")
-    cols_to_drop += ["Old_Variant_Price", "Old_Cost_per_Item"]
-    
-    df_merged.drop(columns=cols_to_drop, inplace=True)
-    
-    # Step 6: Save the final DataFrame as CSV
-    df_merged.to_csv(output_file, index=False)
+    # Step 6: Save the final DataFrame as CSV (or just the changed rows/fields)
+    if diff_only:
+        changes = diff_import(df_products, df_merged, NUMERIC_COLS)
+        paths = write_import_files(changes, output_file, max_rows)
+        print(f"Diff import: {len(changes)} row(s) in {len(paths)} file(s)")
+    else:
+        export.write(output_file, df_merged)
     
     # Finally, report on the number of modified rows and their SKUs
     print(f"Number of rows modified: {num_rows_modified}")
@@ -7,61 +7,42 @@ update Variant Price & Cost per item, and write stentor_products_updated.csv
 """
 
 from pathlib import Path
-import pandas as pd
+
+from price_engine import PriceSource, apply_price_updates
+from price_ledger import record_update
+from shopify_export import ShopifyExport
+from supplier_lists import load_price_list
 
 # ── File paths ────────────────────────────────────────────────────────────────
 PROD_CSV  = Path("stentor_products.csv")
 PRICE_CSV = Path("stentor_pricelist.csv")
 OUT_CSV   = Path("stentor_products_updated.csv")
 
+STENTOR_SOURCE = PriceSource(
+    key="Variant SKU",
+    source_key="Model",
+    fields={"Variant Price": "2025 List", "Cost per item": "Dealer"},
+    skip_blank=True,
+    name="stentor",
+)
+
 def main() -> None:
     # ── 1. Load source files ────────────────────────────────────────────────
-    products = pd.read_csv(
-        PROD_CSV,
-        dtype={"Variant SKU": "string", "Variant Barcode": "string"},
-        keep_default_na=False,
-    )
-
-    pricelist = pd.read_csv(
-        PRICE_CSV,
-        dtype={"Model": "string"},
-        keep_default_na=False,
-    )
-
-    # ── 2. Normalise price columns (remove $, commas → float) ───────────────
-    price_cols = ["2025 List", "Dealer"]
-
-    for col in price_cols:
-        pricelist[col] = (
-            pricelist[col]
-            .astype(str)                         # ensure string ops work
-            .str.replace(r"[$,]", "", regex=True)  # strip symbols & commas
-            .replace("", pd.NA)                  # empty strings → NA
-            .astype(float)
-        )
-
-    # ── 3. Tidy keys & de-duplicate models if needed ────────────────────────
-    pricelist["Model"] = pricelist["Model"].str.strip()
-    pricelist = pricelist.drop_duplicates(subset="Model", keep="first")
-
-    # ── 4. Merge pricelist into products on SKU/Model ───────────────────────
-    merged = products.merge(
-        pricelist[["Model", "2025 List", "Dealer"]],
-        left_on="Variant SKU",
-        right_on="Model",
-        how="left",
-        copy=False,
-    )
-
-    match_mask = merged["2025 List"].notna()
-
-    # ── 5. Update price & cost on matched rows ──────────────────────────────
-    merged.loc[match_mask, "Variant Price"] = merged.loc[match_mask, "2025 List"]
-    merged.loc[match_mask, "Cost per item"] = merged.loc[match_mask, "Dealer"]
-
-    # ── 6. Clean up helper columns & restore original order ─────────────────
-    merged.drop(columns=["Model", "2025 List", "Dealer"], inplace=True)
-    merged = merged[products.columns]          # exact original shape/order
+    #    (catalog: only the columns we match on / update; untouched rows are
+    #     copied byte-for-byte when the result is saved)
+    catalog = ShopifyExport(PROD_CSV, columns=["Handle", "Variant SKU", "Variant Price", "Cost per item"])
+    products = catalog.df
+
+    # ── 2-3. Price list: $/commas stripped → float, Model stripped ──────────
+    #         (parsed once per file version by supplier_lists, then cached;
+    #          the engine keeps the first row per duplicated Model)
+    pricelist = load_price_list(PRICE_CSV, "stentor")
+
+    # ── 4-6. Update price & cost on matched rows ────────────────────────────
+    result = apply_price_updates(products, pricelist, STENTOR_SOURCE)
+    merged = result.catalog                    # same shape/column order as products
+    match_mask = result.applied
+    logged = record_update(result, STENTOR_SOURCE.name)
 
     # ── 7. Reporting ────────────────────────────────────────────────────────
     updated_variants = merged.loc[match_mask, "Handle"]
@@ -72,9 +53,10 @@ def main() -> None:
     if updated_handles:
         for h in updated_handles:
             print(f"   • {h}")
+    print(f"   {logged} price change(s) added to the price ledger.")
 
     # ── 8. Save result ──────────────────────────────────────────────────────
-    merged.to_csv(OUT_CSV, index=False)
+    catalog.write(OUT_CSV, merged)
     print(f"\n✍️  Saved updated catalogue to: {OUT_CSV.resolve()}")
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+# bench_etl.py
+import argparse, json, platform, sys, tempfile, time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import stocky_to_coast as s2c
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+DUP_RATES = [0.0, 0.5, 0.9]
+
+def synthetic_po(n_lines: int, dup_rate: float, seed=0) -> pd.DataFrame:
+    """A valid Stocky PO of `n_lines` lines where roughly `dup_rate` of the lines repeat an earlier SKU."""
+    rng = np.random.default_rng(seed)
+    n_skus = max(1, int(round(n_lines * (1 - dup_rate))))
+    sku_cost = rng.integers(50, 50_000, n_skus) / 100
+    # every SKU appears at least once, the remaining lines are drawn from the same pool
+    idx = np.concatenate([np.arange(n_skus), rng.integers(0, n_skus, n_lines - n_skus)])
+    rng.shuffle(idx)
+    qty = rng.integers(1, 25, n_lines)
+    cost = sku_cost[idx]
+    return pd.DataFrame({
+        "SKU": [f"SKU{i:07d}" for i in idx],
+        "Qty Ordered": qty,
+        "Cost (base)": cost,
+        "Total Cost (base)": np.round(qty * cost, 2),
+    })
+
+def synthetic_history(po: pd.DataFrame, seed=1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    hist = po.drop_duplicates("SKU")[["SKU", "Cost (base)"]].rename(columns={"Cost (base)": "LastCost"})
+    hist["LastCost"] = np.round(hist["LastCost"] * rng.uniform(0.7, 1.3, len(hist)), 2)
+    return hist
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+def bench_case(n_lines, dup_rate, workdir: Path, repeat=3) -> dict:
+    po_path = workdir / f"po_bench_{n_lines}_{int(dup_rate * 100)}.csv"
+    hist_path = workdir / f"hist_{n_lines}_{int(dup_rate * 100)}.csv"
+    po = synthetic_po(n_lines, dup_rate)
+    po.to_csv(po_path, index=False)
+    synthetic_history(po).to_csv(hist_path, index=False)
+
+    validate_pandera = s2c.make_validator("pandera")
+    stages = {}
+    stages["read_csv"], df_in = best_of(lambda: s2c.read_po(po_path), repeat)
+    stages["schema_validate"], validated = best_of(lambda: validate_pandera(df_in), repeat)
+    stages["validate_fast"], _ = best_of(lambda: s2c.validate_fast(df_in), repeat)
+    stages["dedupe_and_normalize"], df_t = best_of(lambda: s2c.dedupe_and_normalize(validated), repeat)
+    stages["to_coast"], out = best_of(lambda: s2c.to_coast(df_t), repeat)
+    stages["hash_output"], _ = best_of(lambda: s2c.hash_output(out), repeat)
+    stages["variance_flags"], flags = best_of(lambda: s2c.variance_flags(df_t, hist_path), repeat)
+    return {
+        "lines": n_lines,
+        "dup_rate": dup_rate,
+        "skus_out": int(len(df_t)),
+        "variance_flags": len(flags),
+        "seconds": {k: round(v, 6) for k, v in stages.items()},
+        "total_seconds": round(sum(v for k, v in stages.items() if k != "validate_fast"), 6),
+    }
+
+def compare(current: dict, baseline: dict, threshold=0.25) -> list:
+    """Stages that got more than `threshold` slower than in `baseline` for the same (lines, dup_rate)."""
+    base = {(r["lines"], r["dup_rate"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        old = base.get((r["lines"], r["dup_rate"]))
+        if not old:
+            continue
+        for stage, secs in r["seconds"].items():
+            before = old["seconds"].get(stage)
+            if before and secs > before * (1 + threshold):
+                regressions.append({"lines": r["lines"], "dup_rate": r["dup_rate"], "stage": stage,
+                                    "before": before, "after": secs, "ratio": round(secs / before, 2)})
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser(description="Time each stage of the Stocky -> Coast ETL on synthetic POs.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="PO line counts to generate")
+    ap.add_argument("--dup-rates", type=float, nargs="+", default=DUP_RATES,
+                    help="Fraction of lines that repeat an earlier SKU")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is recorded")
+    ap.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    ap.add_argument("--compare", help="Earlier results JSON to check for regressions")
+    ap.add_argument("--threshold", type=float, default=0.25, help="Slowdown ratio reported as a regression")
+    args = ap.parse_args()
+
+    report = {
+        "created": pd.Timestamp.now(tz="UTC").isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "repeat": args.repeat,
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            for dup in args.dup_rates:
+                r = bench_case(n, dup, Path(tmp), repeat=args.repeat)
+                report["results"].append(r)
+                stages = "  ".join(f"{k}={v:.4f}" for k, v in r["seconds"].items())
+                print(f"{n:>9,} lines  dup={dup:.2f}  total={r['total_seconds']:.4f}s  {stages}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} @ {r['lines']:,} lines dup={r['dup_rate']:.2f}: "
+                  f"{r['before']:.4f}s -> {r['after']:.4f}s (x{r['ratio']})")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# price_store.py
+import argparse, sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+import pandas as pd
+
+STORE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+
+DDL = """
+CREATE TABLE IF NOT EXISTS last_cost (
+    sku TEXT PRIMARY KEY,
+    last_cost REAL NOT NULL,
+    po TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cost_history (
+    sku TEXT NOT NULL,
+    cost REAL NOT NULL,
+    po TEXT,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cost_history_sku ON cost_history (sku, recorded_at);
+"""
+
+def is_store(path) -> bool:
+    return Path(path).suffix.lower() in STORE_SUFFIXES
+
+class PriceStore:
+    """SQLite price history keyed by SKU: the latest cost per SKU plus every cost recorded for it."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # parallel batch workers may record at the same time; wait on the write lock rather than fail
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.executescript(DDL)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def last_costs(self, skus) -> pd.DataFrame:
+        """LastCost for just the given SKUs (columns SKU, LastCost), via the primary-key index."""
+        skus = pd.unique(pd.Series(skus, dtype=str))
+        cur = self.conn.cursor()
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (sku TEXT PRIMARY KEY)")
+        cur.execute("DELETE FROM wanted")
+        cur.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((s,) for s in skus))
+        rows = cur.execute(
+            "SELECT l.sku, l.last_cost FROM wanted w JOIN last_cost l ON l.sku = w.sku"
+        ).fetchall()
+        return pd.DataFrame(rows, columns=["SKU", "LastCost"])
+
+    def history(self, sku) -> pd.DataFrame:
+        rows = self.conn.execute(
+            "SELECT sku, cost, po, recorded_at FROM cost_history WHERE sku = ? ORDER BY recorded_at",
+            (str(sku),),
+        ).fetchall()
+        return pd.DataFrame(rows, columns=["SKU", "Cost", "PO", "RecordedAt"])
+
+    def record(self, df: pd.DataFrame, po=None, cost_col="Cost (base)"):
+        """Append each SKU's cost to the history and make it the new LastCost."""
+        ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        rows = [(str(sku), float(cost), None if po is None else str(po), ts)
+                for sku, cost in zip(df["SKU"], df[cost_col])]
+        with self.conn:
+            self.conn.executemany("INSERT INTO cost_history VALUES (?, ?, ?, ?)", rows)
+            self.conn.executemany(
+                "INSERT INTO last_cost VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(sku) DO UPDATE SET last_cost = excluded.last_cost, "
+                "po = excluded.po, updated_at = excluded.updated_at",
+                rows,
+            )
+        return len(rows)
+
+    def import_csv(self, csv_path):
+        """Seed the store from a legacy price_history.csv (columns SKU, LastCost)."""
+        hist = pd.read_csv(csv_path, dtype={"SKU": str}).dropna(subset=["SKU", "LastCost"])
+        return self.record(hist, po=None, cost_col="LastCost")
+
+def main():
+    ap = argparse.ArgumentParser(description="Maintain the SQLite price history used for PO variance checks.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="Seed the store from a SKU,LastCost CSV")
+    imp.add_argument("csv")
+    imp.add_argument("store")
+    hist = sub.add_parser("history", help="Print every recorded cost for a SKU")
+    hist.add_argument("store")
+    hist.add_argument("sku")
+    args = ap.parse_args()
+
+    with PriceStore(args.store) as store:
+        if args.cmd == "import":
+            print(f"Imported {store.import_csv(args.csv)} SKU(s) into {args.store}")
+        else:
+            print(store.history(args.sku).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
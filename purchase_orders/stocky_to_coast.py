@@ -1,26 +1,87 @@
 # stocky_to_coast.py
-import argparse, sys, hashlib, json, logging, os
+import argparse, sys, hashlib, glob, json, logging, os, re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from functools import partial
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 import pandas as pd
 import numpy as np
-import pandera as pa
-from pandera import Column, DataFrameSchema, Check
+from price_store import PriceStore, is_store
 
 IN_COLS = ["SKU", "Qty Ordered", "Cost (base)", "Total Cost (base)"]
 OUT_COLS = ["Item Id", "Qty Ordered", "Unit Price", "Extended Price"]
+TOTAL_MISMATCH = "Row total mismatch: |Qty*Cost - Total| > 0.01"
+# bump whenever schema(), dedupe_and_normalize() or the cart layout changes so cached carts are rebuilt
+SCHEMA_VERSION = "1"
+CACHE_FILE = "cache.json"
+
+class ConversionError(Exception):
+    """Base class for errors raised by convert_po(); the CLI exits 1 for ValidationError and 2 for the rest."""
+
+class InputError(ConversionError):
+    """The Stocky input could not be found, read or parsed as CSV."""
+
+class ValidationError(ConversionError, ValueError):
+    """Raised by either validator when a Stocky frame fails the schema.
+
+    `failure_cases` follows pandera's layout (columns: column, index, failure_case) when the failing rows are known.
+    """
+    def __init__(self, message, failure_cases=None):
+        super().__init__(message)
+        self.failure_cases = failure_cases
+
+@dataclass
+class Summary:
+    """Result of one convert_po() run; to_dict() is what summary.json and the CLI print."""
+    po: str
+    input_file: Optional[str]
+    output_file: str
+    output_files: dict
+    rows_in: int
+    rows_validated: int
+    rows_out: int
+    total_qty: int
+    total_extended_price: float
+    variance_flags: list = field(default_factory=list)
+    status: str = "OK"
+    cached: bool = False
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        if not self.cached:
+            del d["cached"]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Summary":
+        return cls(**{f.name: d[f.name] for f in fields(cls) if f.name in d})
 
 def setup_logging(run_dir: Path):
     run_dir.mkdir(parents=True, exist_ok=True)
     logger = logging.getLogger("stocky2coast")
     logger.setLevel(logging.INFO)
+    # one log file per run dir: drop handlers left over from a previous PO in this process
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+        h.close()
     handler = RotatingFileHandler(run_dir / "stocky2coast.log", maxBytes=200_000, backupCount=3)
     fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
     handler.setFormatter(fmt)
     logger.addHandler(handler)
     return logger
 
+# SKUs are identifiers: read them as text so "00123" is never inferred as the number 123
+# (chunked reads infer dtypes per chunk, so an all-digit chunk would otherwise lose its zeros)
+READ_DTYPES = {"SKU": str}
+
+def read_po(path, **kwargs):
+    return pd.read_csv(path, dtype=READ_DTYPES, **kwargs)
+
 def schema():
+    from pandera import Column, DataFrameSchema, Check
     return DataFrameSchema({
         "SKU": Column(str, nullable=False),
         "Qty Ordered": Column(int, Check.ge(0), nullable=False),
@@ -28,22 +89,111 @@ def schema():
         "Total Cost (base)": Column(float, Check.ge(0.0), nullable=False),
     },
     checks=Check(
-        lambda df: np.isclose(df["Qty Ordered"] * df["Cost (base)"], df["Total Cost (base)"], atol=0.01),
-        error="Row total mismatch: |Qty*Cost - Total| > 0.01"
+        lambda df: pd.Series(np.isclose(df["Qty Ordered"] * df["Cost (base)"], df["Total Cost (base)"], atol=0.01), index=df.index),
+        error=TOTAL_MISMATCH
     ),
-    strict=True, coerce=True)
+    strict="filter", coerce=True)
 
-def dedupe_and_normalize(df: pd.DataFrame) -> pd.DataFrame:
-    g = df.groupby("SKU", as_index=False).agg({
+def pandera_validator():
+    import pandera as pa
+    sch = schema()
+    def validate(df: pd.DataFrame) -> pd.DataFrame:
+        try:
+            return sch.validate(df)
+        except pa.errors.SchemaError as e:
+            raise ValidationError(str(e), e.failure_cases) from e
+    return validate
+
+FAST_DTYPES = {"SKU": str, "Qty Ordered": np.int64, "Cost (base)": np.float64, "Total Cost (base)": np.float64}
+
+def _cases(col, index, values) -> pd.DataFrame:
+    return pd.DataFrame({"column": col, "index": index, "failure_case": values})
+
+def _castable(v, dtype) -> bool:
+    try:
+        dtype(v)
+        return True
+    except (TypeError, ValueError, OverflowError):
+        return False
+
+def _coerce(col, raw: np.ndarray, index: np.ndarray, dtype) -> np.ndarray:
+    null = pd.isna(raw)
+    if dtype is str:
+        vals = raw.astype(str).astype(object)
+        vals[null] = np.nan
+        return vals
+    try:
+        if dtype is np.int64 and null.any():
+            raise ValueError("NaN cannot be cast to int64")
+        return raw.astype(dtype)
+    except (TypeError, ValueError, OverflowError):
+        bad = np.array([pd.isna(v) or not _castable(v, dtype) for v in raw], dtype=bool)
+        raise ValidationError(f"Error while coercing '{col}' to type {np.dtype(dtype)}: "
+                              f"failure cases: {', '.join(map(str, raw[bad]))}", _cases(col, index[bad], raw[bad]))
+
+def validate_fast(df: pd.DataFrame) -> pd.DataFrame:
+    """NumPy re-implementation of schema(): same coercion, nullability, >= 0 and row-total checks, no pandera."""
+    missing = [c for c in IN_COLS if c not in df.columns]
+    if missing:
+        raise ValidationError(f"column '{missing[0]}' not in dataframe. Columns in dataframe: {list(df.columns)}")
+    index = df.index.to_numpy()
+    vals = {c: _coerce(c, df[c].to_numpy(), index, dtype) for c, dtype in FAST_DTYPES.items()}
+
+    for c, v in vals.items():
+        null = pd.isna(v)
+        if null.any():
+            raise ValidationError(f"non-nullable series '{c}' contains null values:\n"
+                                  f"{pd.Series(v[null], index=index[null], name=c)}",
+                                  _cases(c, index[null], v[null]))
+        if c != "SKU":
+            neg = v < 0
+            if neg.any():
+                bound = 0 if c == "Qty Ordered" else 0.0
+                raise ValidationError(f"Column '{c}' failed element-wise validator number 0: "
+                                      f"greater_than_or_equal_to({bound}) failure cases: {', '.join(map(str, v[neg]))}",
+                                      _cases(c, index[neg], v[neg]))
+
+    ok = np.isclose(vals["Qty Ordered"] * vals["Cost (base)"], vals["Total Cost (base)"], atol=0.01)
+    if not ok.all():
+        bad = ~ok
+        cases = pd.concat([_cases(c, index[bad], vals[c][bad]) for c in IN_COLS], ignore_index=True)
+        rows = [", ".join(str(vals[c][i]) for c in IN_COLS) for i in np.flatnonzero(bad)]
+        raise ValidationError(f"DataFrameSchema failed element-wise validator number 0: {TOTAL_MISMATCH} "
+                              f"failure cases: {'; '.join(rows)}", cases)
+    return pd.DataFrame(vals, index=df.index)
+
+VALIDATORS = {"pandera": pandera_validator, "fast": lambda: validate_fast}
+
+def make_validator(name="pandera"):
+    return VALIDATORS[name]()
+
+def aggregate_skus(df: pd.DataFrame) -> pd.DataFrame:
+    # re-aggregating concatenated partial results gives the same answer, so chunks can be folded in one at a time
+    return df.groupby("SKU", as_index=False).agg({
         "Qty Ordered": "sum",
         "Cost (base)": "first"  # assume unit cost consistent within PO
     })
+
+def dedupe_and_normalize(df: pd.DataFrame) -> pd.DataFrame:
+    return normalize_totals(aggregate_skus(df))
+
+def normalize_totals(g: pd.DataFrame) -> pd.DataFrame:
     g["Total Cost (base)"] = g["Qty Ordered"] * g["Cost (base)"]
     # normalize money
     for c in ["Cost (base)", "Total Cost (base)"]:
         g[c] = g[c].round(2)
     return g
 
+# name -> (cart file prefix, renderer); every renderer takes the deduped PO frame and returns the cart frame
+CART_FORMATS = {}
+
+def cart_format(name, prefix):
+    def register(fn):
+        CART_FORMATS[name] = (prefix, fn)
+        return fn
+    return register
+
+@cart_format("coast", "new_coast_cart")
 def to_coast(df: pd.DataFrame) -> pd.DataFrame:
     out = pd.DataFrame({
         "Item Id": df["SKU"],
@@ -57,73 +207,294 @@ def hash_output(df: pd.DataFrame) -> str:
     b = df.to_csv(index=False).encode("utf-8")
     return hashlib.md5(b).hexdigest()[:8]
 
+def history_key(price_history) -> str:
+    # a CSV history by path + size + mtime; a store only by path, since each run records into it
+    if not price_history:
+        return ""
+    path = Path(price_history).resolve()
+    if is_store(path) or not path.exists():
+        return str(path)
+    st = path.stat()
+    return f"{path}:{st.st_size}:{st.st_mtime_ns}"
+
+def input_key(source, formats=("coast",), price_history="") -> str:
+    h = hashlib.sha256(f"stocky2coast/{SCHEMA_VERSION}/{','.join(formats)}\n".encode("utf-8"))
+    h.update(f"{history_key(price_history)}\n".encode("utf-8"))
+    if isinstance(source, pd.DataFrame):
+        h.update(json.dumps(list(map(str, source.columns))).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(source, index=False).to_numpy().tobytes())
+        return h.hexdigest()
+    with open(source, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+@contextmanager
+def reading_input(source):
+    try:
+        yield
+    except (FileNotFoundError, IsADirectoryError, PermissionError, UnicodeDecodeError,
+            pd.errors.EmptyDataError, pd.errors.ParserError) as e:
+        raise InputError(f"Cannot read Stocky input {source}: {e}") from e
+
+def load_cache(run_dir: Path) -> dict:
+    try:
+        with open(run_dir / CACHE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def write_summary(run_dir: Path, summary: dict):
+    with open(run_dir / "summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+    with open(run_dir / "summary.md", "w") as f:
+        f.write(f"# PO {summary['po']} Summary\n\n")
+        f.write(f"- Output: `{Path(summary['output_file']).name}`\n")
+        f.write(f"- Rows in/out: {summary['rows_in']} → {summary['rows_out']}\n")
+        f.write(f"- Total Qty: {summary['total_qty']}\n")
+        f.write(f"- Total Extended: ${summary['total_extended_price']:.2f}\n")
+        if summary["variance_flags"]:
+            f.write(f"- **Variance Flags** (>20% vs history): {len(summary['variance_flags'])}\n")
+
 def variance_flags(df: pd.DataFrame, price_hist_path: Path, threshold=0.20):
     if not price_hist_path or not price_hist_path.exists():
         return []
-    hist = pd.read_csv(price_hist_path)  # columns: SKU, LastCost
+    if is_store(price_hist_path):
+        # indexed lookup of only this PO's SKUs instead of reading the whole history
+        with PriceStore(price_hist_path) as store:
+            hist = store.last_costs(df["SKU"])
+    else:
+        hist = read_po(price_hist_path)  # columns: SKU, LastCost
     merged = df.merge(hist, on="SKU", how="left")
     merged["pct_change"] = (merged["Cost (base)"] - merged["LastCost"]) / merged["LastCost"]
     flg = merged[(merged["LastCost"].notna()) & (merged["pct_change"].abs() > threshold)]
     return flg[["SKU", "LastCost", "Cost (base)", "pct_change"]].to_dict(orient="records")
 
-def main():
-    ap = argparse.ArgumentParser(description="Convert Stocky PO CSV to Coast cart CSV with validation.")
-    ap.add_argument("--po", required=True, help="PO number, e.g. 1848")
-    ap.add_argument("--input", required=True, help="Path to Stocky CSV (po_XXXX.csv)")
-    ap.add_argument("--outdir", default="runs", help="Output directory for artifacts")
-    ap.add_argument("--price-history", default="", help="Optional price_history.csv with columns SKU,LastCost")
-    args = ap.parse_args()
+def validate_chunked(input_path, validate, chunksize: int, logger=None):
+    """Validate and aggregate a Stocky CSV `chunksize` rows at a time; returns (deduped, rows_in, rows_validated).
+
+    Chunks keep a running index, so failure cases in a ValidationError carry file-wide row numbers.
+    """
+    acc, rows_in, rows_validated = None, 0, 0
+    for chunk in read_po(input_path, chunksize=chunksize):
+        rows_in += len(chunk)
+        try:
+            validated = validate(chunk)
+        except ValidationError as e:
+            if logger:
+                logger.error(f"Validation failed in data rows {chunk.index[0]}-{chunk.index[-1]}")
+            fc = e.failure_cases
+            if isinstance(fc, pd.DataFrame) and "index" in fc.columns:
+                # +2: one for the header line, one because file lines are 1-based
+                lines = sorted({int(i) + 2 for i in fc["index"].dropna()})
+                if lines:
+                    e.args = (f"{e.args[0]}\nFailing file line(s): {', '.join(map(str, lines[:20]))}",)
+            raise
+        rows_validated += len(validated)
+        part = aggregate_skus(validated)
+        acc = part if acc is None else aggregate_skus(pd.concat([acc, part], ignore_index=True))
+    if acc is None:
+        acc = aggregate_skus(validate(read_po(input_path)))
+    return normalize_totals(acc), rows_in, rows_validated
+
+def po_from_path(path) -> str:
+    m = re.fullmatch(r"po_(.+)\.csv", Path(path).name)
+    if not m:
+        raise InputError(f"Cannot derive PO number from file name: {path}")
+    return m.group(1)
+
+def discover_pos(patterns) -> list:
+    """Return the Stocky exports matching `patterns`; a directory means <dir>/po_*.csv."""
+    found = set()
+    for pattern in [patterns] if isinstance(patterns, (str, Path)) else patterns:
+        base = Path(pattern)
+        if base.is_dir():
+            found.update(base.glob("po_*.csv"))
+        else:
+            found.update(Path(p) for p in glob.glob(str(pattern)) if re.fullmatch(r"po_.+\.csv", Path(p).name))
+    return sorted(found)
+
+def convert_po(po, source, outdir, price_history="", validator="pandera", chunksize=None, force=False,
+               formats=("coast",)) -> Summary:
+    """Validate, dedupe and write one PO into <outdir>/<po>/ and return its Summary.
 
-    run_dir = Path(args.outdir) / f"{args.po}"
+    `source` is the path of a Stocky CSV or an already-loaded DataFrame (`chunksize` only applies to paths).
+    `validator` is a name from VALIDATORS or an already-built validator from make_validator().
+    The deduped frame is rendered once per name in `formats` (see CART_FORMATS); `output_file`
+    is the first cart and `output_files` maps every format to its cart.
+    If this exact input was already converted into the run dir, the earlier cart and summary
+    are reused (`cached` is True) unless `force` is set.
+
+    Raises ValidationError if the PO fails the schema, InputError if the source cannot be read,
+    and ConversionError for other bad requests such as an unknown cart format.
+    """
+    is_frame = isinstance(source, pd.DataFrame)
+    run_dir = Path(outdir) / f"{po}"
     logger = setup_logging(run_dir)
-    logger.info(f"Starting run for PO {args.po}")
+    logger.info(f"Starting run for PO {po}")
 
     try:
-        df_in = pd.read_csv(args.input)
-        validated = schema().validate(df_in[IN_COLS])
-        df_t = dedupe_and_normalize(validated)
-        out = to_coast(df_t)
-        hh = hash_output(out)
+        formats = list(formats)
+        unknown = [f for f in formats if f not in CART_FORMATS]
+        if unknown:
+            raise ConversionError(f"Unknown cart format(s) {unknown}; choose from {sorted(CART_FORMATS)}")
+        with reading_input(source):
+            key = input_key(source, formats, price_history)
+        cache = load_cache(run_dir)
+        hit = cache.get(key)
+        if hit and not force and all(Path(p).exists() for p in hit["output_files"].values()):
+            write_summary(run_dir, hit)
+            logger.info(f"Input unchanged, reusing {Path(hit['output_file']).name}")
+            return Summary.from_dict(dict(hit, cached=True))
+
+        validate = make_validator(validator) if isinstance(validator, str) else validator
+        with reading_input(source):
+            if chunksize and not is_frame:
+                df_t, rows_in, rows_validated = validate_chunked(source, validate, chunksize, logger)
+            else:
+                df_in = source if is_frame else read_po(source)
+                validated = validate(df_in)
+                df_t = dedupe_and_normalize(validated)
+                rows_in, rows_validated = len(df_in), len(validated)
         ts = pd.Timestamp.utcnow().strftime("%Y%m%d-%H%M")
-        out_path = run_dir / f"new_coast_cart_{args.po}_{ts}_{hh}.csv"
-        out.to_csv(out_path, index=False)
-
-        flags = variance_flags(df_t, Path(args.price_history)) if args.price_history else []
-        summary = {
-            "po": args.po,
-            "input_file": str(Path(args.input).resolve()),
-            "output_file": str(out_path.resolve()),
-            "rows_in": int(len(df_in)),
-            "rows_validated": int(len(validated)),
-            "rows_out": int(len(out)),
-            "total_qty": int(out["Qty Ordered"].sum()),
-            "total_extended_price": float(out["Extended Price"].sum()),
-            "variance_flags": flags,
-            "status": "OK"
-        }
-        with open(run_dir / "summary.json", "w") as f:
-            json.dump(summary, f, indent=2)
-        with open(run_dir / "summary.md", "w") as f:
-            f.write(f"# PO {args.po} Summary\n\n")
-            f.write(f"- Output: `{out_path.name}`\n")
-            f.write(f"- Rows in/out: {len(df_in)} → {len(out)}\n")
-            f.write(f"- Total Qty: {summary['total_qty']}\n")
-            f.write(f"- Total Extended: ${summary['total_extended_price']:.2f}\n")
-            if flags:
-                f.write(f"- **Variance Flags** (>20% vs history): {len(flags)}\n")
-
-        logger.info(f"Completed PO {args.po}: {out_path.name}")
-        print(json.dumps(summary, indent=2))
-        sys.exit(0)
-
-    except pa.errors.SchemaError as e:
+        out_files = {}
+        for name in formats:
+            prefix, render = CART_FORMATS[name]
+            cart = render(df_t)
+            cart_path = run_dir / f"{prefix}_{po}_{ts}_{hash_output(cart)}.csv"
+            cart.to_csv(cart_path, index=False)
+            out_files[name] = cart_path
+        out_path = out_files[formats[0]]
+        extended = (df_t["Qty Ordered"] * df_t["Cost (base)"]).round(2)
+
+        flags = variance_flags(df_t, Path(price_history)) if price_history else []
+        summary = Summary(
+            po=po,
+            input_file=None if is_frame else str(Path(source).resolve()),
+            output_file=str(out_path.resolve()),
+            output_files={name: str(path.resolve()) for name, path in out_files.items()},
+            rows_in=int(rows_in),
+            rows_validated=int(rows_validated),
+            rows_out=int(len(df_t)),
+            total_qty=int(df_t["Qty Ordered"].sum()),
+            total_extended_price=float(extended.sum()),
+            variance_flags=flags,
+        )
+        write_summary(run_dir, summary.to_dict())
+        cache[key] = summary.to_dict()
+        with open(run_dir / CACHE_FILE, "w") as f:
+            json.dump(cache, f, indent=2)
+
+        if price_history and is_store(price_history):
+            with PriceStore(price_history) as store:
+                store.record(df_t, po)
+            logger.info(f"Recorded {len(df_t)} cost(s) in {price_history}")
+
+        logger.info(f"Completed PO {po}: {', '.join(path.name for path in out_files.values())}")
+        return summary
+
+    except ValidationError:
         logger.exception("Validation failed")
+        raise
+    except Exception:
+        logger.exception("Unhandled error")
+        raise
+
+_WORKER_VALIDATOR = None
+
+def _init_worker(validator="pandera"):
+    # each pool process builds its validator once and reuses it for every PO it is handed
+    global _WORKER_VALIDATOR
+    _WORKER_VALIDATOR = make_validator(validator)
+
+def _convert_path(path, outdir, validate=None, **opts) -> dict:
+    po = po_from_path(path)
+    try:
+        return convert_po(po, path, outdir, validator=validate or _WORKER_VALIDATOR, **opts).to_dict()
+    except ValidationError as e:
+        return {"po": po, "input_file": str(Path(path).resolve()), "status": "VALIDATION_ERROR", "error": str(e)}
+    except Exception as e:
+        return {"po": po, "input_file": str(Path(path).resolve()), "status": "ERROR", "error": str(e)}
+
+def convert_batch(paths, outdir, price_history="", workers=1, validator="pandera", **opts) -> dict:
+    """Convert every PO in `paths` (in one process, or across `workers` processes) and write batch_summary.json.
+
+    Extra keyword options (chunksize, force, formats) are passed through to convert_po.
+    """
+    paths = list(paths)
+    if workers > 1 and len(paths) > 1:
+        chunk = max(1, len(paths) // (workers * 4))
+        convert = partial(_convert_path, outdir=outdir, price_history=price_history, **opts)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(validator,)) as ex:
+            results = list(ex.map(convert, paths, chunksize=chunk))
+    else:
+        convert = partial(_convert_path, outdir=outdir, validate=make_validator(validator),
+                          price_history=price_history, **opts)
+        results = [convert(path) for path in paths]
+
+    ok = [r for r in results if r["status"] == "OK"]
+    batch = {
+        "pos": len(results),
+        "ok": len(ok),
+        "failed": len(results) - len(ok),
+        "cached": sum(1 for r in ok if r.get("cached")),
+        "total_qty": int(sum(r["total_qty"] for r in ok)),
+        "total_extended_price": float(sum(r["total_extended_price"] for r in ok)),
+        "results": results,
+    }
+    Path(outdir).mkdir(parents=True, exist_ok=True)
+    with open(Path(outdir) / "batch_summary.json", "w") as f:
+        json.dump(batch, f, indent=2)
+    return batch
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Convert Stocky PO CSV to Coast cart CSV with validation.")
+    ap.add_argument("--po", help="PO number, e.g. 1848 (single-file mode)")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--input", help="Path to Stocky CSV (po_XXXX.csv)")
+    src.add_argument("--input-glob", nargs="+", help="Globs or files of Stocky CSVs to convert in one run, e.g. 'inbox/po_*.csv'")
+    src.add_argument("--batch", metavar="DIR", help="Directory whose po_*.csv files are converted in one process")
+    ap.add_argument("--outdir", default="runs", help="Output directory for artifacts")
+    ap.add_argument("--price-history", default="",
+                    help="Optional price_history.csv with columns SKU,LastCost, or a .sqlite price store "
+                         "(see price_store.py) that is updated after each successful PO")
+    ap.add_argument("--chunksize", type=int, default=None,
+                    help="Read and validate the Stocky CSV this many rows at a time to bound memory")
+    ap.add_argument("--validator", choices=sorted(VALIDATORS), default="pandera",
+                    help="Schema validator: pandera (default) or fast, a NumPy-only equivalent that skips importing pandera")
+    ap.add_argument("--formats", nargs="+", choices=sorted(CART_FORMATS), default=["coast"],
+                    help="Cart layout(s) to write from the one validated PO (default: coast); every cart holds the "
+                         "whole PO, so Erikson Music and Erikson Audio POs use coast")
+    ap.add_argument("--force", action="store_true", help="Reconvert even if this input was already converted")
+    ap.add_argument("--workers", type=int, default=1, help="Processes to fan batch POs out across (default 1)")
+    args = ap.parse_args(argv)
+
+    if not args.input:
+        paths = discover_pos(args.batch or args.input_glob)
+        if not paths:
+            print(f"ERROR: no po_*.csv files found for {args.batch or ' '.join(args.input_glob)}", file=sys.stderr)
+            return 2
+        batch = convert_batch(paths, args.outdir, args.price_history, workers=args.workers, chunksize=args.chunksize,
+                              validator=args.validator, force=args.force, formats=args.formats)
+        print(json.dumps(batch, indent=2))
+        return 0 if batch["failed"] == 0 else 1
+
+    if not args.po:
+        ap.error("--po is required with --input")
+
+    try:
+        summary = convert_po(args.po, args.input, args.outdir, args.price_history,
+                             validator=args.validator, chunksize=args.chunksize, force=args.force,
+                             formats=args.formats)
+        print(json.dumps(summary.to_dict(), indent=2))
+        return 0
+
+    except ValidationError as e:
         print(f"VALIDATION ERROR:\n{e}", file=sys.stderr)
-        sys.exit(1)
+        return 1
     except Exception as e:
-        logger.exception("Unhandled error")
         print(f"ERROR: {e}", file=sys.stderr)
-        sys.exit(2)
+        return 2
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,10 +1,26 @@
 # tests/test_etl.py
 
 import pandas as pd
-import subprocess, sys, json, os
+import pytest
+import subprocess, sys, json, os, io
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import stocky_to_coast as s2c
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
 
 def run_cli(args):
-    return subprocess.run([sys.executable, "stocky_to_coast.py"] + args, capture_output=True, text=True)
+    # in-process: same returncode/stdout/stderr as a subprocess, without paying interpreter + pandas start-up per call
+    out, err = io.StringIO(), io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            code = s2c.main(args)
+        except SystemExit as e:
+            code = e.code
+    return SimpleNamespace(returncode=code, stdout=out.getvalue(), stderr=err.getvalue())
 
 def test_happy_path(tmp_path):
     outdir = tmp_path / "runs"
@@ -30,3 +46,197 @@ def test_dedupes_and_recalculates(tmp_path):
     res = run_cli(["--po","1002","--input","tests/fixtures/good.csv","--outdir",str(outdir)])
     assert res.returncode == 0
     # assert deduped output has expected totals/rows
+
+def test_batch_converts_each_po(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for po, fixture in [("2001", "good.csv"), ("2002", "good.csv"), ("2003", "bad_totals.csv")]:
+        (inbox / f"po_{po}.csv").write_text(open(f"tests/fixtures/{fixture}").read())
+    outdir = tmp_path / "runs"
+    res = run_cli(["--batch", str(inbox), "--outdir", str(outdir)])
+    assert res.returncode == 1
+    batch = json.loads(res.stdout)
+    assert (batch["pos"], batch["ok"], batch["failed"]) == (3, 2, 1)
+    assert [r["status"] for r in batch["results"]] == ["OK", "OK", "VALIDATION_ERROR"]
+    assert (outdir / "2001" / "summary.json").exists()
+    assert json.loads((outdir / "batch_summary.json").read_text()) == batch
+    assert "PO 2001" not in (outdir / "2002" / "stocky2coast.log").read_text()
+
+def test_parallel_batch_matches_serial(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for po in range(3001, 3007):
+        (inbox / f"po_{po}.csv").write_text(open("tests/fixtures/good.csv").read())
+    serial = run_cli(["--input-glob", str(inbox / "po_*.csv"), "--outdir", str(tmp_path / "serial")])
+    parallel = run_cli(["--input-glob", str(inbox / "po_*.csv"), "--outdir", str(tmp_path / "parallel"), "--workers", "3"])
+    assert serial.returncode == parallel.returncode == 0
+    s, p = json.loads(serial.stdout), json.loads(parallel.stdout)
+    assert [r["po"] for r in p["results"]] == [r["po"] for r in s["results"]]
+    assert (p["ok"], p["total_qty"], p["total_extended_price"]) == (s["ok"], s["total_qty"], s["total_extended_price"])
+    for po in range(3001, 3007):
+        log = (tmp_path / "parallel" / str(po) / "stocky2coast.log").read_text()
+        assert log.count("Starting run for PO") == 1
+
+def test_price_store_flags_and_records(tmp_path):
+    from price_store import PriceStore
+    store_path = tmp_path / "prices.sqlite"
+    hist = tmp_path / "hist.csv"
+    hist.write_text("SKU,LastCost\nABC123,10.00\nZZZ999,1.00\n")
+    with PriceStore(store_path) as store:
+        store.import_csv(hist)
+    args = ["--input", "tests/fixtures/good.csv", "--outdir", str(tmp_path / "runs"), "--price-history", str(store_path)]
+    first = json.loads(run_cli(["--po", "4001"] + args).stdout)
+    assert [f["SKU"] for f in first["variance_flags"]] == ["ABC123"]
+    second = json.loads(run_cli(["--po", "4002"] + args).stdout)
+    assert second["variance_flags"] == []
+    with PriceStore(store_path) as store:
+        assert store.history("ABC123")["Cost"].tolist() == [10.0, 15.0, 15.0]
+        assert store.last_costs(["DEF456", "NOPE"]).to_dict(orient="records") == [{"SKU": "DEF456", "LastCost": 20.0}]
+
+def test_chunked_matches_full_read(tmp_path):
+    rows = [f"SKU{i % 7},{i % 4 + 1},{(i % 7) * 1.25:.2f},{(i % 4 + 1) * (i % 7) * 1.25:.2f}" for i in range(50)]
+    po = tmp_path / "po_5001.csv"
+    po.write_text("SKU,Qty Ordered,Cost (base),Total Cost (base)\n" + "\n".join(rows) + "\n")
+    full = json.loads(run_cli(["--po", "5001", "--input", str(po), "--outdir", str(tmp_path / "full")]).stdout)
+    chunked = json.loads(run_cli(["--po", "5001", "--input", str(po), "--outdir", str(tmp_path / "chunked"),
+                                  "--chunksize", "8"]).stdout)
+    for key in ["rows_in", "rows_validated", "rows_out", "total_qty", "total_extended_price"]:
+        assert chunked[key] == full[key]
+    assert Path(chunked["output_file"]).read_text() == Path(full["output_file"]).read_text()
+
+def test_chunked_keeps_zero_padded_numeric_skus(tmp_path):
+    po = tmp_path / "po_5003.csv"
+    po.write_text("SKU,Qty Ordered,Cost (base),Total Cost (base)\n"
+                  "00123,1,2.00,2.00\nAB-1,2,1.00,2.00\n00123,3,2.00,6.00\n")
+    full = json.loads(run_cli(["--po", "5003", "--input", str(po), "--outdir", str(tmp_path / "full")]).stdout)
+    chunked = json.loads(run_cli(["--po", "5003", "--input", str(po), "--outdir", str(tmp_path / "chunked"),
+                                  "--chunksize", "2"]).stdout)
+    for key in ["rows_in", "rows_validated", "rows_out", "total_qty"]:
+        assert chunked[key] == full[key]
+    assert full["rows_out"] == 2
+    cart = Path(chunked["output_file"]).read_text()
+    assert cart == Path(full["output_file"]).read_text()
+    assert "00123" in cart
+
+def test_chunked_reports_global_row(tmp_path):
+    rows = [f"SKU{i},1,2.00,2.00" for i in range(20)]
+    rows[13] = "SKU13,1,2.00,9.00"
+    po = tmp_path / "po_5002.csv"
+    po.write_text("SKU,Qty Ordered,Cost (base),Total Cost (base)\n" + "\n".join(rows) + "\n")
+    res = run_cli(["--po", "5002", "--input", str(po), "--outdir", str(tmp_path / "runs"), "--chunksize", "5"])
+    assert res.returncode == 1
+    assert "data rows 10-14" in (tmp_path / "runs" / "5002" / "stocky2coast.log").read_text()
+    assert "Failing file line(s): 15" in res.stderr
+
+def _failing_rows(err):
+    fc = err.failure_cases
+    if not isinstance(fc, pd.DataFrame) or "index" not in fc.columns:
+        return set()
+    return set(fc["index"].dropna().astype(int))
+
+@pytest.mark.parametrize("fixture", sorted(p.name for p in FIXTURES.glob("*.csv")))
+def test_fast_validator_parity(fixture):
+    from stocky_to_coast import IN_COLS, ValidationError, make_validator
+    df = pd.read_csv(FIXTURES / fixture)
+    results = {}
+    for name in ["pandera", "fast"]:
+        try:
+            results[name] = make_validator(name)(df.copy())
+        except ValidationError as e:
+            results[name] = e
+    slow, fast = results["pandera"], results["fast"]
+    assert isinstance(slow, ValidationError) == isinstance(fast, ValidationError) == fixture.startswith("bad")
+    if isinstance(slow, ValidationError):
+        assert _failing_rows(fast) == _failing_rows(slow)
+    else:
+        pd.testing.assert_frame_equal(fast[IN_COLS], slow[IN_COLS])
+
+def test_fast_validator_skips_pandera(tmp_path):
+    code = ("import sys, stocky_to_coast as s; "
+            f"s.convert_po('6001', 'tests/fixtures/good.csv', r'{tmp_path}', validator='fast'); "
+            "print('pandera' in sys.modules)")
+    res = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
+    assert res.stdout.strip() == "False"
+
+def test_unchanged_input_reuses_cart(tmp_path):
+    args = ["--po", "7001", "--input", "tests/fixtures/good.csv", "--outdir", str(tmp_path / "runs")]
+    first = json.loads(run_cli(args).stdout)
+    second = json.loads(run_cli(args).stdout)
+    assert "cached" not in first and second["cached"] is True
+    assert second["output_file"] == first["output_file"]
+    forced = json.loads(run_cli(args + ["--force"]).stdout)
+    assert "cached" not in forced
+    assert len(list((tmp_path / "runs" / "7001").glob("new_coast_cart_*.csv"))) >= 1
+
+def test_cache_is_keyed_on_price_history(tmp_path):
+    hist = tmp_path / "hist.csv"
+    hist.write_text("SKU,LastCost\nABC123,14.00\n")
+    args = ["--po", "7002", "--input", "tests/fixtures/good.csv", "--outdir", str(tmp_path / "runs")]
+    plain = json.loads(run_cli(args).stdout)
+    flagged = json.loads(run_cli(args + ["--price-history", str(hist)]).stdout)
+    assert "cached" not in flagged and plain["variance_flags"] == flagged["variance_flags"] == []
+    hist.write_text("SKU,LastCost\nABC123,10\n")
+    changed = json.loads(run_cli(args + ["--price-history", str(hist)]).stdout)
+    assert "cached" not in changed and [f["SKU"] for f in changed["variance_flags"]] == ["ABC123"]
+    again = json.loads(run_cli(args + ["--price-history", str(hist)]).stdout)
+    assert again["cached"] is True and again["variance_flags"] == changed["variance_flags"]
+    store = tmp_path / "prices.sqlite"
+    run_cli(args + ["--price-history", str(store)])
+    from price_store import PriceStore
+    with PriceStore(store) as s:
+        assert s.history("ABC123")["Cost"].tolist() == [15.0]
+
+def test_multiple_cart_formats_from_one_run(tmp_path, monkeypatch):
+    monkeypatch.setitem(s2c.CART_FORMATS, "skus", ("new_sku_cart", lambda df: df[["SKU", "Qty Ordered"]]))
+    summary = s2c.convert_po("8001", "tests/fixtures/good.csv", tmp_path / "runs", formats=("coast", "skus"))
+    files = summary.output_files
+    assert sorted(files) == ["coast", "skus"]
+    assert summary.output_file == files["coast"]
+    assert Path(files["skus"]).name.startswith("new_sku_cart_8001_")
+    coast, skus = pd.read_csv(files["coast"]), pd.read_csv(files["skus"])
+    assert list(coast.columns) == ["Item Id", "Qty Ordered", "Unit Price", "Extended Price"]
+    assert coast["Qty Ordered"].tolist() == skus["Qty Ordered"].tolist() == [10, 8]
+
+def test_watcher_converts_settled_files_once(tmp_path):
+    from watch_inbox import InboxWatcher
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    watcher = InboxWatcher(inbox, tmp_path / "runs", settle=60, use_inotify=False)
+    (inbox / "po_9001.csv").write_text(open("tests/fixtures/good.csv").read())
+    watcher.run_once()
+    assert watcher.stats["queue_depth"] == 1 and watcher.stats["converted"] == 0
+    watcher.settle = 0
+    watcher.run_once()
+    watcher.run_once()
+    stats = json.loads((tmp_path / "runs" / "watch_stats.json").read_text())
+    assert (stats["queue_depth"], stats["converted"], stats["failed"]) == (0, 1, 0)
+    assert stats["last_file"] == "po_9001.csv" and stats["last_latency_s"] >= 0
+    assert (tmp_path / "runs" / "9001" / "summary.json").exists()
+
+def test_benchmark_smoke(tmp_path):
+    from bench_etl import bench_case, compare, synthetic_po
+    po = synthetic_po(200, 0.75)
+    assert len(po) == 200 and po["SKU"].nunique() == 50
+    r = bench_case(50, 0.5, tmp_path, repeat=1)
+    assert set(r["seconds"]) == {"read_csv", "schema_validate", "validate_fast", "dedupe_and_normalize",
+                                 "to_coast", "hash_output", "variance_flags"}
+    slower = dict(r, seconds={k: v * 10 + 1 for k, v in r["seconds"].items()})
+    assert len(compare({"results": [slower]}, {"results": [r]})) == len(r["seconds"])
+
+def test_convert_po_api_accepts_dataframe(tmp_path):
+    df = pd.read_csv(FIXTURES / "good.csv")
+    summary = s2c.convert_po("10001", df, tmp_path / "runs", validator="fast")
+    assert isinstance(summary, s2c.Summary)
+    assert (summary.rows_in, summary.rows_out, summary.total_qty) == (3, 2, 18)
+    assert summary.input_file is None and Path(summary.output_file).exists()
+    assert s2c.convert_po("10001", df, tmp_path / "runs").cached is True
+
+def test_convert_po_raises_typed_errors(tmp_path):
+    with pytest.raises(s2c.ValidationError) as exc:
+        s2c.convert_po("10002", FIXTURES / "bad_totals.csv", tmp_path / "runs")
+    assert isinstance(exc.value, s2c.ConversionError)
+    with pytest.raises(s2c.InputError):
+        s2c.convert_po("10003", tmp_path / "missing.csv", tmp_path / "runs")
+    with pytest.raises(s2c.ConversionError):
+        s2c.convert_po("10004", FIXTURES / "good.csv", tmp_path / "runs", formats=["nope"])
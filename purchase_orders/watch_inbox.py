@@ -0,0 +1,125 @@
+# watch_inbox.py
+import argparse, json, logging, sys, time
+from pathlib import Path
+import stocky_to_coast as s2c  # pandas (and the chosen validator) load once, when the daemon starts
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # not Linux, or inotify_simple not installed: poll the inbox instead
+    INotify = None
+
+logger = logging.getLogger("watch_inbox")
+
+class InboxWatcher:
+    """Convert po_*.csv files as they land in `inbox`, keeping one warm interpreter.
+
+    A file is converted once its size and mtime have been unchanged for `settle` seconds, so
+    exports that are still being written are left alone. A file is converted again only if it
+    changes later. Counters are written to <outdir>/watch_stats.json after every conversion.
+    """
+
+    def __init__(self, inbox, outdir, settle=0.5, poll=1.0, use_inotify=True, validator="pandera", **convert_opts):
+        self.inbox, self.outdir = Path(inbox), Path(outdir)
+        self.settle, self.poll = settle, poll
+        self.validate = s2c.make_validator(validator)
+        self.convert_opts = convert_opts
+        self.pending = {}  # path -> (signature, first_seen, last_changed)
+        self.seen = {}     # path -> signature of the version last converted
+        self.latencies = []
+        self.stats = {"watcher": "poll", "queue_depth": 0, "converted": 0, "cached": 0, "failed": 0,
+                      "last_file": None, "last_latency_s": None, "mean_latency_s": None, "max_latency_s": None}
+        self.inotify = None
+        if use_inotify and INotify is not None:
+            self.inotify = INotify()
+            self.inotify.add_watch(str(self.inbox), flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.MODIFY)
+            self.stats["watcher"] = "inotify"
+
+    def scan(self, now):
+        for path in self.inbox.glob("po_*.csv"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            sig = (st.st_size, st.st_mtime_ns)
+            if self.seen.get(path) == sig:
+                continue
+            prev = self.pending.get(path)
+            if prev is None or prev[0] != sig:
+                self.pending[path] = (sig, prev[1] if prev else now, now)
+        self.stats["queue_depth"] = len(self.pending)
+
+    def ready(self, now):
+        return sorted(p for p, (_, _, changed) in self.pending.items() if now - changed >= self.settle)
+
+    def convert(self, path):
+        sig, first_seen, _ = self.pending.pop(path)
+        try:
+            summary = s2c.convert_po(s2c.po_from_path(path), path, self.outdir, validator=self.validate,
+                                     **self.convert_opts)
+            self.stats["cached" if summary.cached else "converted"] += 1
+            logger.info(f"{path.name} -> {Path(summary.output_file).name}")
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"{path.name} failed: {e}")
+        self.seen[path] = sig
+
+        latency = time.monotonic() - first_seen
+        self.latencies.append(latency)
+        self.stats.update({
+            "queue_depth": len(self.pending),
+            "last_file": path.name,
+            "last_latency_s": round(latency, 3),
+            "mean_latency_s": round(sum(self.latencies) / len(self.latencies), 3),
+            "max_latency_s": round(max(self.latencies), 3),
+        })
+        self.write_stats()
+
+    def write_stats(self):
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        with open(self.outdir / "watch_stats.json", "w") as f:
+            json.dump(self.stats, f, indent=2)
+
+    def run_once(self):
+        self.scan(time.monotonic())
+        for path in self.ready(time.monotonic()):
+            self.convert(path)
+
+    def wait(self):
+        # wake early while files are settling so they are converted as soon as they are quiet
+        timeout = min(self.poll, self.settle) if self.pending else self.poll
+        if self.inotify is not None:
+            self.inotify.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(timeout)
+
+    def run(self):
+        logger.info(f"Watching {self.inbox} ({self.stats['watcher']}), writing runs to {self.outdir}")
+        self.write_stats()
+        while True:
+            self.run_once()
+            self.wait()
+
+def main():
+    ap = argparse.ArgumentParser(description="Watch an inbox folder and convert Stocky PO exports as they arrive.")
+    ap.add_argument("inbox", help="Folder Stocky exports po_XXXX.csv files into")
+    ap.add_argument("--outdir", default="runs", help="Output directory for artifacts")
+    ap.add_argument("--price-history", default="", help="price_history.csv or .sqlite store, as for stocky_to_coast.py")
+    ap.add_argument("--validator", choices=sorted(s2c.VALIDATORS), default="pandera")
+    ap.add_argument("--formats", nargs="+", choices=sorted(s2c.CART_FORMATS), default=["coast"])
+    ap.add_argument("--settle", type=float, default=0.5, help="Seconds a file must be unchanged before converting")
+    ap.add_argument("--poll", type=float, default=1.0, help="Polling interval in seconds (inotify wake-up timeout)")
+    ap.add_argument("--no-inotify", action="store_true", help="Always poll, even if inotify is available")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    watcher = InboxWatcher(args.inbox, args.outdir, settle=args.settle, poll=args.poll,
+                           use_inotify=not args.no_inotify, validator=args.validator,
+                           price_history=args.price_history, formats=args.formats)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.write_stats()
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,38 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
+# the shared price-update engine lives with the other catalog updaters in products/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "products"))
+from price_engine import PriceSource, apply_price_updates
+from price_ledger import record_update
+from shopify_export import ShopifyExport
+from supplier_lists import load_price_list
+
+DADDARIO_SOURCE = PriceSource(
+    key="Variant SKU",
+    source_key="ProdCode",
+    fields={"Cost per item": "Net Price"},
+    skip_blank=True,
+    name="daddario",
+)
 
 def update_cost_per_item():
-    # 1) Read CSV files into DataFrames.
-    #    Use dtype=str for columns that you want to preserve exactly (no leading zeros dropped, etc.)
-    df = pd.read_csv(
-        'evans_products.csv',
-        dtype={
-            'Variant SKU': str,           # ensure SKU remains as string
-            'Variant Barcode': str        # ensure Barcode remains as string (if present)
-        }
-    )
-    
-    df_daddario = pd.read_csv(
-        'daddario_pricelist_2025.csv',
-        dtype={'ProdCode': str}  # ensure product codes remain as string
-    )
-    
-    # 2) Create a dictionary mapping from ProdCode -> Net Price
-    price_map = dict(zip(df_daddario['ProdCode'], df_daddario['Net Price']))
+    # 1) Read just the SKU and cost columns (SKU as text, so no leading zeros are dropped);
+    #    every other column is copied from the source file verbatim on save.
+    export = ShopifyExport('evans_products.csv', columns=['Handle', 'Variant SKU', 'Cost per item'])
+    df = export.df
     
-    # 3) Store the old cost per item to compare later.
-    old_cost_series = df['Cost per item'].copy()
+    # Parsed price list (ProdCode as string, Net Price as float), cached in .price_cache/
+    df_daddario = load_price_list('daddario_pricelist_2025.csv', 'daddario')
     
-    # 4) Compute the new cost where there's a match, otherwise NaN.
-    matched_price_series = df['Variant SKU'].map(price_map)
-    
-    # 5) Identify which rows will actually change.
-    #    Updated means: (a) there's a match (not NaN), and (b) the new cost differs from the old cost.
-    will_update_mask = matched_price_series.notna() & (matched_price_series != old_cost_series)
-    
-    # 6) Apply the updates: replace old cost with the matched price where available, otherwise keep old cost.
-    df['Cost per item'] = matched_price_series.fillna(old_cost_series)
+    # 2-6) Match ProdCode -> Net Price and replace Cost per item where there's a match.
+    #      A row counts as updated only if the new cost differs from the old cost.
+    result = apply_price_updates(df, df_daddario, DADDARIO_SOURCE)
+    df = result.catalog
     
     # 7) Extract the SKUs that were updated.
-    updated_skus = df.loc[will_update_mask, 'Variant SKU'].tolist()
+    updated_skus = df.loc[result.changed, 'Variant SKU'].tolist()
+    record_update(result, DADDARIO_SOURCE.name)   # keep the old/new cost in the price ledger
     
     # 8) Print information about updated products.
     print(f"Number of products updated: {len(updated_skus)}")
@@ -44,9 +43,8 @@ def update_cost_per_item():
     else:
         print("No products were updated.")
     
-    # 9) Save the updated DataFrame to a new CSV file.
-    df.to_csv('evans_products_updated.csv', index=False)
+    # 9) Save to a new CSV file: only rows whose cost changed are rewritten.
+    export.write('evans_products_updated.csv', df)
 
 if __name__ == "__main__":
     update_cost_per_item()
-